@@ -0,0 +1,204 @@
+'''
+Benchmarks for Simplicial_Complex on families of complexes of growing size.
+
+Every case is built from arrays of vertex ids and then timed stage by stage: construction, validation, boundary
+operators and homology. The peak memory of each stage is measured with tracemalloc in a second, separate pass, so
+tracing does not slow down the timings. With --processes, the homology stage still reduces the operators already
+built, and a 'parallel' stage times the homology of a fresh complex, whose operators are built and reduced in the
+process pool (tracemalloc does not see the memory of the workers). Results are written as one JSON object per line,
+for example
+
+	python benchmark.py --families torus rips --sizes 10 20 40 --output results.jsonl
+'''
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+import numpy as np
+from simplicial_hom import Simplicial_Complex
+
+STAGES = ['construction', 'validation', 'boundary', 'homology']
+
+'''
+The stages to run, with the homology of a fresh complex computed in the process pool when there is one
+'''
+def stages(processes):
+	return STAGES + ['parallel'] if processes else STAGES
+
+# The sizes used for a family when none are given
+DEFAULT_SIZES = {
+	'sphere': [10, 20, 40],
+	'torus': [10, 20, 40],
+	'flag': [100, 200, 400],
+	'rips': [200, 400, 800],
+}
+
+'''
+Complete a list of triangles (rows of vertex ids) into the arrays of vertices, edges and triangles of its closure
+'''
+def closure(triangles, n_vertices):
+	triangles = np.unique(np.sort(triangles, axis=1), axis=0)
+	edges = np.vstack((triangles[:, [0, 1]], triangles[:, [0, 2]], triangles[:, [1, 2]]))
+	edges = np.unique(edges, axis=0)
+	return [np.arange(n_vertices)[:, None], edges, triangles]
+
+'''
+Triangulate an n by m grid of squares, each cut along a diagonal, where vertex (j, i) has id index(j, i)
+'''
+def grid_triangles(n, m, index):
+	j, i = np.meshgrid(np.arange(n), np.arange(m), indexing='ij')
+	j, i = j.ravel(), i.ravel()
+	a, b, c, d = index(j, i), index(j, i + 1), index(j + 1, i), index(j + 1, i + 1)
+	return np.vstack((np.stack((a, b, d), axis=1), np.stack((a, c, d), axis=1)))
+
+'''
+A sphere made of n rings of n vertices, with the first and last rings coned off to a pole
+'''
+def sphere(n):
+	north, south = n * n, n * n + 1
+	around = np.arange(n)
+	triangles = np.vstack((
+		grid_triangles(n - 1, n, lambda j, i: j * n + i % n),
+		np.stack((np.full(n, north), around, (around + 1) % n), axis=1),
+		np.stack((np.full(n, south), (n - 1) * n + around, (n - 1) * n + (around + 1) % n), axis=1)))
+	return closure(triangles, n * n + 2)
+
+'''
+A torus made of an n by n grid of vertices, glued along opposite sides
+'''
+def torus(n):
+	return closure(grid_triangles(n, n, lambda j, i: (j % n) * n + i % n), n * n)
+
+'''
+The flag complex of a random graph on n vertices, where each edge appears with probability p, up to dimension
+max_dim. p defaults to 8 / n, so the average degree stays around 8 as n grows. The number of edges is drawn first
+and then that many distinct random pairs, so only the edges are ever stored and n can grow into the millions
+'''
+def flag(n, p=None, max_dim=3, rng=None):
+	rng = np.random.default_rng() if rng is None else rng
+	p = min(1.0, 8 / n) if p is None else p
+	n_edges = rng.binomial(n * (n - 1) // 2, p)
+
+	keys = np.zeros(0, dtype=np.int64)
+	while len(keys) < n_edges:
+		u = rng.integers(0, n, 2 * (n_edges - len(keys)) + 16)
+		v = rng.integers(0, n, len(u))
+		u, v = np.minimum(u, v)[u != v], np.maximum(u, v)[u != v]
+		keys = np.sort(np.concatenate((keys, u * n + v)))
+		keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+	keys = rng.permutation(keys)[:n_edges]
+	return Simplicial_Complex.flag_simplices(n, keys // n, keys % n, max_dim)[0]
+
+'''
+The Rips complex of n random points in the unit square, with a radius that keeps the average degree around 8
+'''
+def rips(n, max_dim=3, rng=None):
+	rng = np.random.default_rng() if rng is None else rng
+	points = rng.random((n, 2))
+	return Simplicial_Complex.rips_simplices(points, math.sqrt(8 / (math.pi * n)), max_dim)[0]
+
+FAMILIES = {
+	'sphere': lambda size, rng: sphere(size),
+	'torus': lambda size, rng: torus(size),
+	'flag': lambda size, rng: flag(size, rng=rng),
+	'rips': lambda size, rng: rips(size, rng=rng),
+}
+
+'''
+Run every stage on a new complex built from simplices. With memory=True each stage runs under tracemalloc and its
+peak allocation in bytes is returned, otherwise its time in seconds is
+'''
+def run_stages(simplices, field, reduce, processes, memory):
+	results = {}
+	complex = None
+
+	def construction():
+		return Simplicial_Complex.from_arrays(simplices, field=field, validate=False, reduce=reduce,
+			processes=processes)
+
+	for stage in stages(processes):
+		if stage == 'construction':
+			work = construction
+		elif stage == 'validation':
+			work = complex.is_valid
+		elif stage == 'boundary':
+			work = complex.compute_boundary_operators
+		elif stage == 'homology':
+			work = complex.betti_numbers
+		else:
+			# a fresh complex has no boundary operators yet, so betti_numbers takes the process pool path
+			work = construction().betti_numbers
+
+		if memory:
+			tracemalloc.start()
+			value = work()
+			results[stage] = tracemalloc.get_traced_memory()[1]
+			tracemalloc.stop()
+		else:
+			start = time.perf_counter()
+			value = work()
+			results[stage] = time.perf_counter() - start
+
+		if stage == 'construction':
+			complex = value
+		elif stage == 'validation':
+			assert value, "The benchmark complex is not a simplicial complex"
+		elif stage == 'parallel':
+			assert value == complex.betti_numbers(), "The process pool gives other Betti numbers"
+	return complex, results
+
+'''
+Benchmark one member of a family, keeping the fastest of repeat timing runs
+'''
+def benchmark(family, size, field=0, reduce=False, processes=None, repeat=1, memory=True, seed=0):
+	simplices = FAMILIES[family](size, np.random.default_rng(seed))
+
+	seconds = None
+	for run in range(repeat):
+		complex, times = run_stages(simplices, field, reduce, processes, False)
+		seconds = times if seconds is None else {stage: min(seconds[stage], times[stage]) for stage in times}
+
+	result = {
+		'family': family,
+		'size': size,
+		'field': field,
+		'reduce': reduce,
+		'processes': processes,
+		'simplices': [len(array) for array in simplices],
+		'betti': [int(b) for b in complex.betti_numbers()],
+		'seconds': seconds,
+	}
+	if memory:
+		result['peak_bytes'] = run_stages(simplices, field, reduce, processes, True)[1]
+	return result
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Benchmark Simplicial_Complex on growing families of complexes")
+	parser.add_argument('--families', nargs='+', choices=sorted(FAMILIES), default=sorted(FAMILIES))
+	parser.add_argument('--sizes', nargs='+', type=int, help="sizes for every family, instead of the defaults")
+	parser.add_argument('--field', type=int, choices=[0, 2], default=0, help="0 for the integers, 2 for Z/2")
+	parser.add_argument('--reduce', action='store_true', help="reduce to the Morse complex first")
+	parser.add_argument('--processes', type=int, help="size of the process pool, if any")
+	parser.add_argument('--repeat', type=int, default=1, help="timing runs per case, the fastest is kept")
+	parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--output', help="file to append the JSON lines to, instead of stdout")
+	args = parser.parse_args(argv)
+
+	output = sys.stdout if args.output is None else open(args.output, 'a')
+	try:
+		for family in args.families:
+			for size in (args.sizes or DEFAULT_SIZES[family]):
+				result = benchmark(family, size, args.field, args.reduce, args.processes, args.repeat,
+					not args.no_memory, args.seed)
+				output.write(json.dumps(result) + '\n')
+				output.flush()
+	finally:
+		if output is not sys.stdout:
+			output.close()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,192 @@
+'''
+Persistent homology of filtered simplicial complexes, following the column reduction algorithm from
+"Computational Algebriac Topology Lecture Notes" written by Vidit Nanda
+The notes are given here https://people.maths.ox.ac.uk/nanda/cat/TDANotes.pdf
+
+The reduction uses the clearing (twist) optimization of Chen and Kerber, "Persistent Homology Computation with a Twist"
+'''
+import math
+import os
+import numpy as np
+from simplicial_hom import Simplicial_Complex
+
+class Filtered_Complex(Simplicial_Complex):
+	'''
+	Initiate a filtered simplicial complex from a list of (simplex, filtration value) pairs.
+
+	The simplices are sorted by value (faces first on ties), so every dimension of the underlying Simplicial_Complex
+	is in filtration order and its boundary operators are exactly the blocks of the filtered boundary matrix.
+	Coefficients are in Z/2, where the columns are reduced as sets of row indices
+	'''
+	def __init__(self, filtered_list, field=2, validate=True):
+		assert field == 2, "Persistence is only computed with Z/2 coefficients"
+		ordered = sorted(filtered_list, key=lambda pair: (pair[1], Simplicial_Complex.dim(pair[0])))
+
+		# The values of each dimension line up with self.simplices once the complex is built
+		self.values = {}
+		for simplex, value in ordered:
+			self.values.setdefault(Simplicial_Complex.dim(simplex), []).append(value)
+		self.values = [np.array(self.values[cur_dim], dtype=float) for cur_dim in sorted(self.values)]
+
+		super().__init__([simplex for simplex, value in ordered], field, validate)
+
+	'''
+	Build the Vietoris-Rips filtration of a point cloud up to dimension max_dim, where a simplex enters when its
+	longest edge does, and only edges up to radius are considered
+ 	'''
+	@staticmethod
+	def from_point_cloud(points, radius, max_dim=2):
+		simplices, values = Simplicial_Complex.rips_simplices(points, radius, max_dim)
+		return Filtered_Complex.from_arrays(simplices, values)
+
+	'''
+	Initiate a filtered simplicial complex straight from the arrays of vertex ids and filtration values of every
+	dimension. Each dimension is put in filtration order before the complex is built
+ 	'''
+	@staticmethod
+	def from_arrays(simplices, values, labels=None, validate=True):
+		complex = Filtered_Complex.__new__(Filtered_Complex)
+		orders = [np.argsort(value, kind='stable') for value in values]
+		complex.values = [np.asarray(value, dtype=float)[order] for value, order in zip(values, orders)]
+		complex._initialize([np.asarray(array)[order] for array, order in zip(simplices, orders)], labels, 2, validate)
+		return complex
+
+	'''
+	Check that every simplex enters the filtration no earlier than its faces. Every column of delta_i holds exactly
+	its i + 1 faces, so the latest face of every i-simplex is found for all of them at once
+ 	'''
+	def is_filtration(self):
+		for i in range(1, self.dim + 1):
+			delta = self.boundary_operator[i]
+			latest = self.values[i - 1][delta.indices].reshape(-1, i + 1).max(axis=1)
+			if np.any(latest > self.values[i]):
+				return False
+		return True
+
+	'''
+	Reduce the filtered boundary matrix, one dimension at a time from the top down.
+
+	When a column of delta_i+1 reduces to lowest row r, the i-simplex r is paired with it and its own column in
+	delta_i must reduce to zero, so it is cleared without any work (the twist). Every column that reduces to zero
+	(or is cleared) gives birth to a class; it dies at the simplex it is paired with, or is essential if it is never
+	paired. The pairs of dimension i are stored in self.pairs[i] as (birth simplex, death simplex) indices, with a
+	death of None for the essential classes
+ 	'''
+	def compute_persistence(self):
+		assert self.is_filtration(), "Some simplex enters the filtration before one of its faces"
+
+		pairs = [[] for i in range(0, self.dim + 1)]
+
+		# births holds the i-simplices already paired by delta_i+1, whose columns in delta_i are cleared
+		births = set()
+		for i in range(self.dim, -1, -1):
+			deaths = set()
+			if i > 0:
+				pivots = {}
+				for j, col in enumerate(self.boundary_operator[i].column_sets()):
+					if j in births:
+						continue
+					col = Simplicial_Complex._reduce_against(col, pivots, 2)
+					if col:
+						low = max(col)
+						pivots[low] = col
+						pairs[i - 1].append((low, j))
+						deaths.add(j)
+
+			# i-simplices that neither kill a class nor have their class killed are essential
+			for j in range(len(self.simplices[i])):
+				if j not in births and j not in deaths:
+					pairs[i].append((j, None))
+			births = set(low for low, j in pairs[i - 1]) if i > 0 else set()
+
+		for i in range(0, self.dim + 1):
+			pairs[i].sort(key=lambda pair: pair[0])
+		self._pairs = pairs
+		return pairs
+
+	'''
+	The persistence pairs, computed the first time they are needed
+ 	'''
+	@property
+	def pairs(self):
+		if self._pairs is None:
+			self.compute_persistence()
+		return self._pairs
+
+	def invalidate(self):
+		super().invalidate()
+		self._pairs = None
+
+	'''
+	Save and load the filtration values and, once computed, the persistence pairs along with the complex. Pairs are
+	stored as (count, 2) arrays of simplex indices, where a death of -1 marks an essential class
+ 	'''
+	def _save_extra(self, directory, meta):
+		for i in range(self.dim + 1):
+			np.save(os.path.join(directory, 'values_{}.npy'.format(i)), self.values[i])
+		meta['pairs'] = self._pairs is not None
+		if self._pairs is not None:
+			for i in range(self.dim + 1):
+				pairs = np.array([(birth, -1 if death is None else death) for birth, death in self._pairs[i]],
+					dtype=np.int64).reshape(-1, 2)
+				np.save(os.path.join(directory, 'pairs_{}.npy'.format(i)), pairs)
+
+	@staticmethod
+	def load(directory, mmap=True):
+		complex = Filtered_Complex.__new__(Filtered_Complex)
+		complex._load(directory, mmap)
+		return complex
+
+	def _load_extra(self, directory, meta, mmap_mode):
+		self.values = [np.load(os.path.join(directory, 'values_{}.npy'.format(i)), mmap_mode=mmap_mode)
+			for i in range(self.dim + 1)]
+		if meta['pairs']:
+			self._pairs = []
+			for i in range(self.dim + 1):
+				pairs = np.load(os.path.join(directory, 'pairs_{}.npy'.format(i)))
+				self._pairs.append([(birth, None if death < 0 else death) for birth, death in pairs.tolist()])
+
+	'''
+	Simplices can only be added to a filtration along with their values, which is not supported
+ 	'''
+	def add_simplices(self, simplices):
+		raise NotImplementedError("Simplices cannot be added to a Filtered_Complex")
+
+	'''
+	Return the barcode of dimension i as a list of (birth, death) filtration values, where the essential classes
+	die at infinity. Bars of length zero are dropped unless keep_empty is True
+ 	'''
+	def barcode(self, i, keep_empty=False):
+		bars = []
+		for birth, death in self.pairs[i]:
+			start = float(self.values[i][birth])
+			end = math.inf if death is None else float(self.values[i + 1][death])
+			if keep_empty or end > start:
+				bars.append((start, end))
+		return bars
+
+	'''
+	The homology of a filtered complex is its persistent homology, so the Betti numbers of the whole complex are
+	read from the persistence pairs: they count the essential classes, and the rank of delta_i is the number of
+	finite pairs of dimension i - 1
+  	'''
+	def betti_numbers(self):
+		if self._betti is not None:
+			return self._betti
+
+		self._rank = {0: 0}
+		for i in range(0, self.dim + 1):
+			self._rank[i + 1] = sum(1 for birth, death in self.pairs[i] if death is not None)
+		self._torsion = [[] for i in range(0, self.dim + 1)]
+		self._betti = [sum(1 for birth, death in self.pairs[i] if death is None) for i in range(0, self.dim + 1)]
+		return self._betti
+
+
+if __name__ == '__main__':
+	# A triangle whose edges appear one at a time, and which is filled in last
+	print("Filtered triangle\n")
+	K = Filtered_Complex([(['A'], 0), (['B'], 0), (['C'], 1), (['A', 'B'], 1), (['B', 'C'], 2), (['C', 'A'], 3),
+					(['A', 'B', 'C'], 5)])
+	for i in range(K.dim + 1):
+		print("Barcode in dimension", i, K.barcode(i))
+	print(", ".join(K.homology_groups()))
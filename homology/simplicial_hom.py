@@ -2,7 +2,14 @@
 The code developed is inspired from "Computational Algebriac Topology Lecture Notes" written by Vidit Nanda
 The notes are given here https://people.maths.ox.ac.uk/nanda/cat/TDANotes.pdf
 '''
+import collections
+import concurrent.futures
+import itertools
+import json
+import math
+import os
 import numpy as np
+from multiprocessing import shared_memory
 
 class Simplicial_Complex:
 	'''
@@ -13,261 +20,1616 @@ class Simplicial_Complex:
 		return len(simplex) - 1
 
 	'''
- 	For a simplex, check if the class has all subsets of this simplex one dimension lower 
-  	'''
-	def contains_subsets_of(self, simplex):
+	Return the vertex ids of a simplex given by its labels, sorted, which is how simplices are looked up and
+	oriented. A label that is not a vertex of the class gets the id -1
+	'''
+	def vertex_ids(self, simplex):
+		if self.labels is None:
+			return tuple(sorted(int(vertex) for vertex in simplex))
+		return tuple(sorted(self.label_ids.get(vertex, -1) for vertex in simplex))
+
+	'''
+	Return the labels of the vertices of a simplex given by its ids
+	'''
+	def vertex_labels(self, ids):
+		if self.labels is None:
+			return [int(vertex) for vertex in ids]
+		return [self.labels[vertex] for vertex in ids]
+
+	'''
+	Return the whole class as a list of simplices, each a list of vertex labels
+	'''
+	def to_list(self):
+		return [self.vertex_labels(simplex) for cur_dim in range(self.dim + 1) for simplex in self.simplices[cur_dim]]
+
+	'''
+	Find the rows of the given i-simplices (an array of sorted vertex ids, one simplex per row) in
+	self.simplices[i], or -1 for those that are not in the class. The lookup is a binary search in the sorted keys of
+	dimension i, so it is done for all the simplices at once
+	'''
+	def find(self, i, rows):
+		rows = np.ascontiguousarray(rows, dtype=np.int32).reshape(-1, i + 1)
+		if i > self.dim:
+			return np.full(len(rows), -1, dtype=np.int64)
+		keys = Simplicial_Complex._keys(rows)
+		if len(self.sorted_keys[i]) == 0:
+			found = np.full(len(rows), -1, dtype=np.int64)
+		else:
+			position = np.minimum(np.searchsorted(self.sorted_keys[i], keys), len(self.sorted_keys[i]) - 1)
+			found = self.key_order[i][position]
+			found[self.sorted_keys[i][position] != keys] = -1
+
+		# Simplices added since the sorted keys were last built are only in the dictionary of recent keys
+		if self.recent_keys[i]:
+			for idx in np.flatnonzero(found < 0):
+				found[idx] = self.recent_keys[i].get(keys[idx].tobytes(), -1)
+		return found
+
+	'''
+	View every row of an int32 array as one opaque key, so rows can be sorted and searched as a whole
+	'''
+	@staticmethod
+	def _keys(rows):
+		rows = np.ascontiguousarray(rows, dtype=np.int32)
+		return rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+	'''
+	Return the faces of the i-simplices, as an (count, i + 1, i) array where [:, k] drops the k-th vertex
+	'''
+	def faces(self, i):
+		simplices = self.simplices[i]
+		return np.stack([np.delete(simplices, k, axis=1) for k in range(i + 1)], axis=1)
+
+	'''
+	For a simplex, list the faces one dimension lower that are not in the class.
+	Every face is looked up in the index of its dimension, so this costs O(dim) binary searches
+	'''
+	def missing_faces_of(self, simplex):
 		# Vertices have no proper subset but the empty set
 		if Simplicial_Complex.dim(simplex) == 0:
-			return True
-  
-		lower_simplices = self.simplices[Simplicial_Complex.dim(simplex) - 1]
-  
+			return []
+
 		# Generate all the faces for the simplex
-		face = simplex
-		for i in range(Simplicial_Complex.dim(simplex) + 1):
-			vert = face.pop(i)
-			is_face_in = False
-			for lower_simplex in lower_simplices:
-				if set(lower_simplex) == set(face):
-					is_face_in = True
-			face.insert(i, vert)
-   
-			if not is_face_in:
-				return False
+		vertices = self.vertex_ids(simplex)
+		faces = np.array([vertices[:i] + vertices[i + 1:] for i in range(len(vertices))])
+		found = self.find(Simplicial_Complex.dim(simplex) - 1, faces)
+		if self.labels is not None:
+			# name the faces by the labels given, in the same order as the ids
+			labels = sorted(simplex, key=lambda vertex: self.label_ids.get(vertex, -1))
+			return [tuple(labels[:i] + labels[i + 1:]) for i in np.flatnonzero(found < 0)]
+		return [tuple(int(v) for v in faces[i]) for i in np.flatnonzero(found < 0)]
 
-		# All possible faces are already in the complex
-		return True
+	'''
+ 	For a simplex, check if the class has all subsets of this simplex one dimension lower 
+  	'''
+	def contains_subsets_of(self, simplex):
+		return not self.missing_faces_of(simplex)
+
+	'''
+	List every (simplex, face) pair of the class where the face is missing, so an invalid complex can be
+	reported in one pass. All the faces of a dimension are looked up at once
+	'''
+	def missing_faces(self):
+		missing = []
+		for cur_dim in range(1, self.dim + 1):
+			faces = self.faces(cur_dim)
+			found = self.find(cur_dim - 1, faces.reshape(-1, cur_dim)).reshape(faces.shape[:2])
+			for idx, k in np.argwhere(found < 0):
+				missing.append((self.vertex_labels(self.simplices[cur_dim][idx]),
+					tuple(self.vertex_labels(faces[idx, k]))))
+		return missing
 
 	'''
 	Check if the simplicial complex given is valid
 	'''
 	def is_valid(self):
 		# For every simplex, check if all subsets of it is contained within the class
-		for cur_dim in range(0, self.dim + 1):
-			for simplex in self.simplices[cur_dim]:
-				if not self.contains_subsets_of(simplex):
-					return False
+		for cur_dim in range(1, self.dim + 1):
+			faces = self.faces(cur_dim)
+			if np.any(self.find(cur_dim - 1, faces.reshape(-1, cur_dim)) < 0):
+				return False
 		return True
 
 
+	'''
+	Add a simplex, given by its labels, to the class. See add_simplices
+	'''
+	def add_simplex(self, simplex):
+		self.add_simplices([simplex])
+
+	'''
+	Add simplices, given by their labels, to the class while keeping the Betti numbers up to date.
+
+	The simplices are added by increasing dimension, and every face of a simplex has to be in the class already or
+	be added in the same call. Closure is checked through the index for the whole call before anything changes, so
+	a call that fails leaves the class as it was. Then every new boundary column is reduced against
+	the pivots kept from the previous reductions: if it reduces to zero, it creates a new cycle and the Betti number
+	of its dimension goes up, otherwise it becomes a pivot and kills a class one dimension lower. So an insertion
+	only costs the reduction of one column, instead of the whole homology computation.
+
+	With integer coefficients the ranks are over the rationals, and the torsion is recomputed when it is next asked for
+	'''
+	def add_simplices(self, simplices):
+		simplices = sorted(simplices, key=len)
+
+		# The simplices of the call count as present for the ones after them
+		added = set()
+		missing = []
+		for simplex in simplices:
+			missing += [(simplex, face) for face in self.missing_faces_of(simplex) if frozenset(face) not in added]
+			added.add(frozenset(simplex))
+		assert not missing, "Not a simplicial complex, missing faces: {}".format(missing)
+
+		reduction = self._incremental_reduction()
+
+		# Everything else that depends on the simplices is rebuilt on demand
+		self._boundary_operator = None
+		self._morse = None
+		self._cocycles = None
+		self._coboundary_pivots = None
+		self._torsion = None
+		self._Z = None
+		self._B = None
+		self._generators = None
+
+		for simplex in simplices:
+			ids = self._intern(simplex)
+			i = len(ids) - 1
+			if i <= self.dim and self.find(i, np.array([ids]))[0] >= 0:
+				continue
+
+			faces = np.array([ids[:k] + ids[k + 1:] for k in range(i + 1)], dtype=np.int32).reshape(i + 1, i)
+			rows = self.find(i - 1, faces) if i > 0 else np.zeros(0, dtype=np.int64)
+
+			while i > self.dim:
+				self._grow_dimension()
+			self._append(i, ids)
+
+			# Reduce the new column of delta_i against the pivots of delta_i
+			if self.field == 2:
+				column = set(rows.tolist())
+			else:
+				column = {int(row): -1 if k % 2 else 1 for k, row in enumerate(rows)}
+			column = Simplicial_Complex._reduce_against(column, reduction[i], self.field)
+
+			if column:
+				reduction[i][max(column)] = column
+				self._rank[i] += 1
+				self._betti[i - 1] -= 1
+			else:
+				self._betti[i] += 1
+
+	'''
+	Return the sorted vertex ids of a simplex given by its labels, giving ids to the labels never seen before
+	'''
+	def _intern(self, simplex):
+		if self.labels is None:
+			return tuple(sorted(int(vertex) for vertex in simplex))
+		for vertex in simplex:
+			if vertex not in self.label_ids:
+				self.label_ids[vertex] = len(self.labels)
+				self.labels.append(vertex)
+		return self.vertex_ids(simplex)
+
+	'''
+	Append the simplex with the given sorted vertex ids to dimension i. The array of every dimension is a view into a
+	buffer that doubles in size when it is full, so appending is amortized O(1)
+	'''
+	def _append(self, i, ids):
+		count = len(self.simplices[i])
+		buffer = self._buffers[i]
+		if count == len(buffer):
+			buffer = np.empty((max(16, 2 * count), i + 1), dtype=np.int32)
+			buffer[:count] = self.simplices[i]
+			self._buffers[i] = buffer
+		buffer[count] = ids
+		self.simplices[i] = buffer[:count + 1]
+
+		self.recent_keys[i][Simplicial_Complex._keys(buffer[count:count + 1])[0].tobytes()] = count
+		if len(self.recent_keys[i]) > 1024 + count // 8:
+			self._index_dimension(i)
+
+	'''
+	Make room for simplices one dimension higher than the class has so far
+	'''
+	def _grow_dimension(self):
+		self.dim += 1
+		self.simplices.append(np.zeros((0, self.dim + 1), dtype=np.int32))
+		self._buffers.append(self.simplices[-1])
+		self.key_order.append(None)
+		self.sorted_keys.append(None)
+		self.recent_keys.append({})
+		self._index_dimension(self.dim)
+		self._reduction[self.dim] = {}
+		self._rank[self.dim + 1] = 0
+		self._betti.append(0)
+
+	'''
+	The pivots of every reduced boundary operator, along with the ranks and Betti numbers they give, which is the state
+	that add_simplices updates. It is built by one full reduction the first time it is needed
+	'''
+	def _incremental_reduction(self):
+		if self._reduction is None:
+			reduction = {0: {}}
+			for i in range(1, self.dim + 1):
+				reduction[i] = {}
+				delta = self.boundary_operator[i]
+				columns = delta.column_sets() if self.field == 2 else (delta.column(j) for j in range(delta.shape[1]))
+				for column in columns:
+					column = Simplicial_Complex._reduce_against(column, reduction[i], self.field)
+					if column:
+						reduction[i][max(column)] = column
+
+			self._rank = {0: 0, self.dim + 1: 0}
+			for i in range(1, self.dim + 1):
+				self._rank[i] = len(reduction[i])
+			self._betti = [len(self.simplices[i]) - self._rank[i] - self._rank[i + 1] for i in range(0, self.dim + 1)]
+			self._reduction = reduction
+		return self._reduction
+
 	'''
 	Initiate a simplicial complex
+
+	field selects the coefficients of the homology: 0 for the integers (ranks over the rationals), or 2 for Z/2,
+	where boundary columns are reduced as sets of row indices.
+
+	The vertices are interned to the ids 0, 1, 2, ... in order of appearance, with self.labels mapping the ids back
+	to the labels given, and the i-simplices are stored as one (count, i + 1) int32 array of sorted ids.
+
+	Only the storage is built here. The check that every face is present can be skipped with validate=False, and the
+	boundary operators and homology are computed the first time they are asked for. With reduce=True, the Betti
+	numbers and torsion are computed on the (much smaller) Morse complex of morse_complex() instead. With processes
+	set to a number of worker processes, the boundary operators of all dimensions (and their ranks) are computed
+	concurrently
 	'''
-	def __init__(self, complex_as_list):
-		# Store the list
-		self.complex_as_list = complex_as_list
-    
-  		# Get the dimension of the simplicial complex (the maximum of the dimensions of all the simplices)
-		self.dim = 0
+	def __init__(self, complex_as_list, field=0, validate=True, reduce=False, processes=None):
+		labels = []
+		label_ids = {}
+		rows = {}
 		for simplex in complex_as_list:
-			if Simplicial_Complex.dim(simplex) > self.dim:
-				self.dim = Simplicial_Complex.dim(simplex)
+			row = []
+			for vertex in simplex:
+				if vertex not in label_ids:
+					label_ids[vertex] = len(labels)
+					labels.append(vertex)
+				row.append(label_ids[vertex])
+			rows.setdefault(Simplicial_Complex.dim(row), []).append(row)
 
-		# Seperate the list into different dimension
+		# Seperate the list into different dimension, up to the dimension of the simplicial complex
+		dim = max(rows) if rows else 0
+		simplices = []
+		for cur_dim in range(dim + 1):
+			simplices.append(np.array(rows.get(cur_dim, []), dtype=np.int32).reshape(-1, cur_dim + 1))
+		self._initialize(simplices, labels, field, validate, reduce, processes)
 
-		# Create an array that holds simplices of 0th dimension to the highest dimension 
-		self.simplices = []
+	'''
+	Initiate a simplicial complex straight from the arrays of vertex ids of every dimension, without going through
+	python lists. labels maps the ids back to names, and None means that every vertex is named by its id
+	'''
+	@staticmethod
+	def from_arrays(simplices, labels=None, field=0, validate=True, reduce=False, processes=None):
+		complex = Simplicial_Complex.__new__(Simplicial_Complex)
+		complex._initialize(simplices, labels, field, validate, reduce, processes)
+		return complex
+
+	def _initialize(self, simplices, labels, field, validate, reduce=False, processes=None):
+		assert field in (0, 2), "Only integer (0) and Z/2 (2) coefficients are supported"
+		self.field = field
+		self.reduce = reduce
+		self.processes = processes
+		self.labels = labels
+		self.label_ids = None if labels is None else {label: idx for idx, label in enumerate(labels)}
+
+		# Create an array that holds simplices of 0th dimension to the highest dimension, each with sorted vertices
+		self.simplices = [np.sort(np.asarray(array, dtype=np.int32), axis=1) for array in simplices]
+		self._buffers = list(self.simplices)
+		self.dim = len(self.simplices) - 1
+
+		# Index every simplex by its sorted vertices, so a face can be found without scanning its dimension
+		self.key_order = []
+		self.sorted_keys = []
+		self.recent_keys = []
 		for cur_dim in range(self.dim + 1):
-			self.simplices.append([])
-			for simplex in complex_as_list:
-				if Simplicial_Complex.dim(simplex) == cur_dim:
-					self.simplices[cur_dim].append(simplex)
-		# Then confirm that the list given is indeed a simplicial complex
-		assert(self.is_valid())
-  
-		# After confirming it is indeed a simplicial complex, compute the boundary operators
-		self.compute_boundary_operators()
-  
-		# After computing the boundary operators, compute the homology group
-		self.compute_homology()
-	
+			self.key_order.append(None)
+			self.sorted_keys.append(None)
+			self.recent_keys.append({})
+			self._index_dimension(cur_dim)
+
+		# Then confirm that the list given is indeed a simplicial complex, reporting every missing face at once
+		if validate:
+			missing = self.missing_faces()
+			assert not missing, "Not a simplicial complex, missing faces: {}".format(missing)
+
+		# The boundary operators and the homology are computed on demand
+		self.invalidate()
+
 	'''
- 	Auxillary function that determines if simplex_two, a subset of simplex_one, has the same orientation
-	If simplex_two appears in simplex_one in the same order, then it returns True. Otherwise, the orientation is reversed,
-	and so it return False.
-	
-	Since the inputs given are guaranteed to be a subset of one another created from obsolving 
-  	'''
-	def oriented(self, simplex_one, simplex_two):
-		# Found on stackoverflow, unfortunately can't find it again. No idea how it works, but it does the job
-		def generate_list(l1, l2):
-			for element in l1:
-				if element in l2:
-					yield element
-		for x1, x2 in zip(generate_list(simplex_one, simplex_two), generate_list(simplex_two, simplex_one)):
-			if x1 != x2:
-				return False
-		return True
+	Sort the keys of the i-simplices, folding in the simplices that were only indexed as recent keys
+	'''
+	def _index_dimension(self, i):
+		keys = Simplicial_Complex._keys(self.simplices[i])
+		order = np.argsort(keys, kind='stable')
+		self.key_order[i] = order
+		self.sorted_keys[i] = keys[order]
+		self.recent_keys[i] = {}
 
 	'''
-	Compute the boundary operators 
+	Forget the boundary operators and homology computed so far. This has to be called whenever the simplices change
+	'''
+	def invalidate(self):
+		self._boundary_operator = None
+		self._rank = None
+		self._torsion = None
+		self._betti = None
+		self._Z = None
+		self._B = None
+		self._generators = None
+		self._reduction = None
+		self._morse = None
+		self._cocycles = None
+		self._coboundary_pivots = None
+
+	'''
+	The boundary operators, built the first time they are needed
+	'''
+	@property
+	def boundary_operator(self):
+		if self._boundary_operator is None:
+			self.compute_boundary_operators()
+		return self._boundary_operator
+
+	'''
+	The ranks of the boundary operators, the Betti numbers and the torsion, computed the first time they are needed
+	'''
+	@property
+	def rank(self):
+		self.betti_numbers()
+		return self._rank
+
+	@property
+	def betti(self):
+		return self.betti_numbers()
+
+	@property
+	def torsion(self):
+		self.betti_numbers()
+		if self._torsion is None:
+			self._torsion = [[] for i in range(0, self.dim + 1)]
+			if self.field != 2:
+				for i in range(1, self.dim + 1):
+					factors = Simplicial_Complex.smith_normal_form(self.boundary_operator[i])
+					self._torsion[i - 1] = [d for d in factors if d > 1]
+		return self._torsion
+
+	'''
+	The cycles Z and boundaries B of every dimension, computed the first time they are needed
+	'''
+	@property
+	def Z(self):
+		self.compute_homology(bases=True)
+		return self._Z
+
+	@property
+	def B(self):
+		self.compute_homology(bases=True)
+		return self._B
+
+	@property
+	def generators(self):
+		self.compute_homology(bases=True)
+		return self._generators
+
+	'''
+	Build the Vietoris-Rips complex of a point cloud, up to dimension max_dim.
+
+	points is an (N, d) array, and a set of points spans a simplex when every pair of them is at distance at most
+	radius. The vertices are labelled 0, ..., N - 1
+ 	'''
+	@staticmethod
+	def from_point_cloud(points, radius, max_dim=2, field=0):
+		simplices = Simplicial_Complex.rips_simplices(points, radius, max_dim)[0]
+		return Simplicial_Complex.from_arrays(simplices, field=field)
+
+	'''
+	Compute the simplices of the Vietoris-Rips complex, as one (count, dim + 1) array of sorted vertices per
+	dimension, along with the filtration value of every simplex (the length of its longest edge).
+
+	Neighbours are found on a grid of cells of side radius, so only points in adjacent cells are ever compared
+	(or by a sweep along one axis in high dimensions, see _neighbour_pairs). The complex is then the flag complex
+	of the neighbour graph, see flag_simplices
+ 	'''
+	@staticmethod
+	def rips_simplices(points, radius, max_dim=2):
+		assert radius > 0, "The radius has to be positive"
+		points = np.asarray(points, dtype=float)
+		if points.ndim == 1:
+			points = points[:, None]
+		n = len(points)
+		if max_dim < 1 or n == 0:
+			return [np.arange(n, dtype=np.int64)[:, None]], [np.zeros(n)]
+
+		u, v = Simplicial_Complex._neighbour_pairs(points, radius)
+		lengths = np.linalg.norm(points[u] - points[v], axis=1)
+		return Simplicial_Complex.flag_simplices(n, u, v, max_dim, lengths)
+
+	'''
+	Compute the simplices of the flag (clique) complex of a graph on the vertices 0, ..., n - 1 with the edges
+	(u[k], v[k]), u[k] < v[k], up to dimension max_dim. Every vertex enters at 0 and every edge at lengths[k] (0 when
+	lengths is None), and a simplex enters with its last edge, so the values of every dimension are returned too.
+
+	Cliques are grown one dimension at a time, all at once: every k-simplex is extended by the neighbours
+	of its last vertex that come after it, and a candidate is kept when it is adjacent to all the other vertices,
+	which is checked by binary search in the sorted edge keys. Only the edges are ever stored, never an n by n matrix
+ 	'''
+	@staticmethod
+	def flag_simplices(n, u, v, max_dim=2, lengths=None):
+		u = np.asarray(u, dtype=np.int64)
+		v = np.asarray(v, dtype=np.int64)
+		lengths = np.zeros(len(u)) if lengths is None else np.asarray(lengths, dtype=float)
+
+		# Vertices enter at 0, edges at their length
+		simplices = [np.arange(n, dtype=np.int64)[:, None]]
+		values = [np.zeros(n)]
+		if max_dim < 1 or n == 0:
+			return simplices, values
+
+		edge_keys = u * n + v
+		order = np.argsort(edge_keys)
+		u, v, lengths, edge_keys = u[order], v[order], lengths[order], edge_keys[order]
+		simplices.append(np.stack((u, v), axis=1))
+		values.append(lengths)
+
+		# The upper neighbours of every vertex, in increasing order, as consecutive slices of v
+		starts = np.searchsorted(u, np.arange(n + 1))
+
+		for cur_dim in range(2, max_dim + 1):
+			lower = simplices[-1]
+			last = lower[:, -1]
+			counts = starts[last + 1] - starts[last]
+			if counts.sum() == 0:
+				break
+
+			# every (simplex, upper neighbour of its last vertex) pair
+			owner = np.repeat(np.arange(len(lower)), counts)
+			offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+			candidate = v[np.repeat(starts[last], counts) + offsets]
+			value = np.maximum(np.repeat(values[-1], counts), lengths[np.repeat(starts[last], counts) + offsets])
+
+			# the candidate has to be adjacent to every other vertex of the simplex as well
+			keep = np.ones(len(candidate), dtype=bool)
+			for k in range(cur_dim - 1):
+				keys = lower[owner, k] * n + candidate
+				found = np.minimum(np.searchsorted(edge_keys, keys), len(edge_keys) - 1)
+				keep &= edge_keys[found] == keys
+				value = np.maximum(value, lengths[found])
+
+			simplices.append(np.hstack((lower[owner[keep]], candidate[keep][:, None])))
+			values.append(value[keep])
+			if len(simplices[-1]) == 0:
+				simplices.pop()
+				values.pop()
+				break
+
+		return simplices, values
+
+	'''
+	Find every pair of points (u, v), u < v, at distance at most radius, using a grid of cells of side radius.
+
+	Every point is compared with the 3^d cells around its own, so the grid is meant for low dimensions (point clouds
+	in the plane or in space). Once 3^d exceeds the number of points it would cost more than comparing every pair,
+	so the pairs are found by a sweep instead
+	'''
+	@staticmethod
+	def _neighbour_pairs(points, radius):
+		n, d = points.shape
+		if 3 ** d > n:
+			return Simplicial_Complex._sweep_pairs(points, radius)
+
+		cells = np.floor(points / radius).astype(np.int64)
+		cells -= cells.min(axis=0) - 1
+
+		# Number the cells with a mixed radix key, leaving room for the neighbours of the border cells
+		strides = np.cumprod(np.concatenate(([1], cells.max(axis=0)[:-1] + 2)))
+		keys = cells @ strides
+		order = np.argsort(keys, kind='stable')
+		sorted_keys = keys[order]
+
+		pairs_u = []
+		pairs_v = []
+		for offset in itertools.product((-1, 0, 1), repeat=d):
+			neighbour = keys + np.dot(offset, strides)
+			first = np.searchsorted(sorted_keys, neighbour, side='left')
+			counts = np.searchsorted(sorted_keys, neighbour, side='right') - first
+
+			# pair every point with every point of the neighbouring cell
+			u = np.repeat(np.arange(n), counts)
+			offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+			v = order[np.repeat(first, counts) + offsets]
+
+			close = (u < v) & (np.sum((points[u] - points[v]) ** 2, axis=1) <= radius * radius)
+			pairs_u.append(u[close])
+			pairs_v.append(v[close])
+		return np.concatenate(pairs_u), np.concatenate(pairs_v)
+
+	'''
+	Find the same pairs as _neighbour_pairs in any dimension. The points are sorted along the axis where they spread
+	the most, and each one is only compared with the points that follow it within radius along that axis
+	'''
+	@staticmethod
+	def _sweep_pairs(points, radius):
+		axis = int(np.argmax(np.ptp(points, axis=0)))
+		order = np.argsort(points[:, axis], kind='stable')
+		coordinates = points[order, axis]
+		first = np.arange(1, len(points))
+		counts = np.searchsorted(coordinates, coordinates + radius, side='right')[:-1] - first
+
+		i = np.repeat(np.arange(len(points) - 1), counts)
+		j = i + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+		u, v = order[i], order[j]
+		close = np.sum((points[u] - points[v]) ** 2, axis=1) <= radius * radius
+		u, v = u[close], v[close]
+		return np.minimum(u, v), np.maximum(u, v)
+
+	'''
+	Compute the boundary operators
+
+	Each operator is stored as a Sparse_Matrix, so a column of delta_i holds exactly i + 1 nonzero entries and
+	the memory used grows with the number of simplices rather than with its square. The faces of every simplex are
+	enumerated and looked up in the index, so building delta_i is linear in the number of i-simplices.
+	Simplices are oriented by their sorted vertices
  	'''
 	def compute_boundary_operators(self):
-		self.boundary_operator = []
+		if self.processes:
+			self._compute_in_parallel(ranks=False)
+			return self._boundary_operator
+
+		boundary_operator = []
   
 		# delta_0 is just mapping all points to nothing
-		self.boundary_operator.append(np.ones((1, len(self.simplices[0]))))
+		boundary_operator.append(Sparse_Matrix.zeros((0, len(self.simplices[0]))))
 
 		# delta_i is just C_i to C_i-1
 		for i in range(1, self.dim + 1):
-			upper_simplices = self.simplices[i]
-			lower_simplices = self.simplices[i - 1]
-			self.boundary_operator.append(np.zeros((len(lower_simplices), len(upper_simplices))))
-
-			for low_idx in range(len(lower_simplices)):
-				lower_simplex = lower_simplices[low_idx]			
-				for upper_idx in range(len(upper_simplices)):
-					upper_simplex = upper_simplices[upper_idx]
-    
-					# if lower_simplex is a subset of upper_simplex, then it is a face of the upper_simplex
-					if set(upper_simplex) >= set(lower_simplex):
-
-						# if the orientation of the lower_simplex is the same as the orientation of the upper_simplex
-						# multiply the incidence
-						if self.oriented(upper_simplex, lower_simplex):
-							(self.boundary_operator[i])[low_idx][upper_idx] = 1
-						else:
-							(self.boundary_operator[i])[low_idx][upper_idx] = -1
-       
-		# the final boundary operator d_n+1: 0->C_n is simply every basis element of C_n 
-		self.boundary_operator.append(np.ones((len(self.simplices[self.dim]), 1)))		
- 
+			rows = self.find(i - 1, self.faces(i).reshape(-1, i))
+			boundary_operator.append(Simplicial_Complex._boundary_matrix(i, len(self.simplices[i - 1]), rows))
+
+		# the final boundary operator d_n+1: 0->C_n maps nothing onto C_n
+		boundary_operator.append(Sparse_Matrix.zeros((len(self.simplices[self.dim]), 0)))
+		self._boundary_operator = boundary_operator
+		return boundary_operator
+
 	'''
-	Find Smith Normal Form of A.
+	Lay delta_i out as a Sparse_Matrix, given the rows of the faces of every i-simplex, i + 1 per simplex in order
+ 	'''
+	@staticmethod
+	def _boundary_matrix(i, n_rows, rows):
+		count = len(rows) // (i + 1)
+
+		# The k-th face of a simplex [v_0, ..., v_i] drops v_k and appears in its boundary with sign (-1)^k
+		signs = np.tile(np.where(np.arange(i + 1) % 2, -1, 1).astype(np.int8), count)
+		indptr = np.arange(0, (i + 1) * count + 1, i + 1)
+		return Sparse_Matrix((n_rows, count), indptr, rows, signs)
+
 	'''
+	Build delta_i from the arrays of i-simplices and (i - 1)-simplices alone, sorting the keys of the lower simplices
+	to look the faces up. This is what every worker of the process pool runs
+ 	'''
 	@staticmethod
-	def smith_normal_form(A):
-		n = len(A)
-		m = len(A[0])
-		Dtop = np.hstack( (np.eye(n), A.copy()) )
-		Dbot = np.hstack( (np.zeros((m, n)), np.eye(m)) )
-		D = np.vstack( (Dtop, Dbot) )
-  
-		rank = 0
-		
-		# Apply a modified form of the RREF algorithm, which starts at index n (or where A resides)
-		# Modified RREF algorithm given by https://math.stackexchange.com/questions/3073083/how-to-reduce-matrix-into-row-echelon-form-in-numpy
-		for col in range(n, n + min(m, n)):
-				
-			# For the current row, search for the elements in A are nonzero
-			i = col - n
-			for j in range(i, n):
-				if D[j][col] != 0:
-					rank = rank + 1
-					i = j
-					break
+	def boundary_from_arrays(upper, lower):
+		i = upper.shape[1] - 1
+		faces = np.stack([np.delete(upper, k, axis=1) for k in range(i + 1)], axis=1).reshape(-1, i)
+		keys = Simplicial_Complex._keys(lower)
+		order = np.argsort(keys, kind='stable')
+		sorted_keys = keys[order]
+		face_keys = Simplicial_Complex._keys(faces)
+		position = np.minimum(np.searchsorted(sorted_keys, face_keys), len(sorted_keys) - 1)
+		assert np.all(sorted_keys[position] == face_keys), "Not a simplicial complex, some faces are missing"
+		return Simplicial_Complex._boundary_matrix(i, len(lower), order[position])
+
+	'''
+	Build the boundary operators, and with ranks=True also their ranks (and torsion), with one task per dimension
+	in a pool of self.processes processes. The operators of different dimensions do not depend on each other, so
+	the tasks run concurrently, the largest first. The simplex arrays are copied once into shared memory, which
+	every worker maps instead of receiving its own copy
+ 	'''
+	def _compute_in_parallel(self, ranks=True):
+		shared = []
+		try:
+			specs = []
+			for i in range(self.dim + 1):
+				array = np.ascontiguousarray(self.simplices[i], dtype=np.int32)
+				memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+				np.ndarray(array.shape, dtype=np.int32, buffer=memory.buf)[:] = array
+				shared.append(memory)
+				specs.append((memory.name, array.shape))
+
+			tasks = [(i, specs[i], specs[i - 1], self.field if ranks else None) for i in range(1, self.dim + 1)]
+			tasks.sort(key=lambda task: -task[1][1][0] * task[1][1][1])
+			with concurrent.futures.ProcessPoolExecutor(max_workers=self.processes) as pool:
+				results = {i: (delta, factors) for i, delta, factors in pool.map(_parallel_task, tasks)}
+		finally:
+			for memory in shared:
+				memory.close()
+				memory.unlink()
+
+		boundary_operator = [Sparse_Matrix.zeros((0, len(self.simplices[0])))]
+		boundary_operator.extend(results[i][0] for i in range(1, self.dim + 1))
+		boundary_operator.append(Sparse_Matrix.zeros((len(self.simplices[self.dim]), 0)))
+		self._boundary_operator = boundary_operator
+		if not ranks:
+			return
+
+		# The workers return the rank over Z/2, or the invariant factors over the integers
+		rank = {0: 0, self.dim + 1: 0}
+		torsion = [[] for i in range(0, self.dim + 1)]
+		for i in range(1, self.dim + 1):
+			factors = results[i][1]
+			if self.field == 2:
+				rank[i] = factors
 			else:
-				# All the elements in this row are zero, so continue
+				rank[i] = len(factors)
+				torsion[i - 1] = [d for d in factors if d > 1]
+		self._rank = rank
+		self._torsion = torsion
+		self._betti = [len(self.simplices[i]) - rank[i] - rank[i + 1] for i in range(0, self.dim + 1)]
+
+	'''
+	Shrink the class to its Morse complex, which has the same homology (over the integers, torsion included).
+
+	An acyclic matching is built by coreductions: a simplex with exactly one face left is paired with that face and
+	both are removed, after which their cofaces are looked at again. When no such simplex is left, the lowest
+	dimensional simplex remaining, which has no faces left, is made critical. Every pair (t, s) has
+	incidence +-1, so it is removed from the chain complex exactly: the cofaces c of t get the boundary
+	d(c) - <d(c), t> <d(s), t> d(s). Since s has no other face left but t, only critical simplices are ever added to a
+	boundary, so the boundaries are tracked for those alone, and the boundary of a critical simplex is final once it
+	becomes critical. Closed meshes, which have no free face to collapse, typically shrink to a handful of cells.
+
+	Returns the critical simplices of every dimension (as indices into self.simplices) and the boundary operators
+	between them, in the same layout as self.boundary_operator
+ 	'''
+	def morse_complex(self):
+		if self._morse is not None:
+			return self._morse
+
+		# Number the simplices of all dimensions one after the other
+		counts = [len(self.simplices[i]) for i in range(self.dim + 1)]
+		offsets = np.concatenate(([0], np.cumsum(counts)))
+		n = int(offsets[-1])
+		dims = np.repeat(np.arange(self.dim + 1), counts)
+
+		faces = [[] for c in range(counts[0])]
+		cofaces = []
+		for i in range(1, self.dim + 1):
+			rows = self.find(i - 1, self.faces(i).reshape(-1, i)).reshape(-1, i + 1) + offsets[i - 1]
+			faces.extend(rows.tolist())
+
+			# cofaces of the (i - 1)-simplices, grouped through a sort of the face column
+			flat = rows.ravel() - offsets[i - 1]
+			order = np.argsort(flat, kind='stable')
+			starts = np.searchsorted(flat[order], np.arange(counts[i - 1] + 1))
+			owners = (order // (i + 1) + offsets[i]).tolist()
+			cofaces.extend(owners[starts[j]:starts[j + 1]] for j in range(counts[i - 1]))
+		cofaces.extend([] for c in range(counts[self.dim]))
+
+		alive = bytearray(b'\x01') * n
+		remaining = [len(face) for face in faces]
+		boundary = {}
+		critical = [[] for i in range(self.dim + 1)]
+		morse = {}
+		queue = collections.deque()
+		lowest = 0
+		left = n
+
+		while left:
+			if queue:
+				s = queue.popleft()
+				if not alive[s] or remaining[s] != 1:
+					continue
+			else:
+				# Nothing can be paired, so the lowest dimensional simplex left (which has no faces left) is critical
+				while not alive[lowest]:
+					lowest += 1
+				s = lowest
+
+			if remaining[s] == 0:
+				# s is critical; it becomes a critical face of its cofaces
+				alive[s] = 0
+				left -= 1
+				critical[dims[s]].append(s)
+				morse[s] = boundary.pop(s, {})
+				for c in cofaces[s]:
+					if alive[c]:
+						boundary.setdefault(c, {})[s] = -1 if faces[c].index(s) % 2 else 1
+						remaining[c] -= 1
+						queue.append(c)
 				continue
-			
-			# Swap the row at i with the row associated with the column
-			irow = D[i].copy()
-			D[i] = D[col - n]
-			D[col - n] = irow
-   
-			# Reduce the row
-			D[col - n] = D[col - n]/D[col - n][col]
-   
-			# Now that rows are swapped, put zeros on top and bottom
-			for row in range(0, n):
-				if row != col - n and D[row][col] != 0:
-					D[row] = D[row] - D[col - n] * D[row][col]
-     
-		# At this point, all matrices should be reduced in A, but if columns in A > rows in A, it
-		# might be the case that A still isn't in Smith Normal Form
-		# The solution in this case is simple and it's to get set to zeros the remaining columns
-		if m > n:
-			D[:, n + n:] = D[:, n + n:] * 0
-  
-		# get P and Q
-		P = D[0:n,0:n]
-		Q = D[n:, n:]
-  
-		return rank, P, Q
+
+			# s has a single face t left, so (t, s) is a coreduction pair
+			k = next(k for k, face in enumerate(faces[s]) if alive[face])
+			t = faces[s][k]
+			sign = -1 if k % 2 else 1
+			extra = boundary.pop(s, None)
+			boundary.pop(t, None)
+			alive[s] = 0
+			alive[t] = 0
+			left -= 2
+			for c in cofaces[t]:
+				if alive[c]:
+					if extra:
+						coefficient = -1 if faces[c].index(t) % 2 else 1
+						boundary[c] = Simplicial_Complex._combine(1, boundary.get(c, {}), -coefficient * sign, extra)
+					remaining[c] -= 1
+					queue.append(c)
+			for c in cofaces[s]:
+				if alive[c]:
+					remaining[c] -= 1
+					queue.append(c)
+
+		# Lay the boundaries of the critical simplices out as matrices between the critical simplices
+		position = {}
+		for i in range(self.dim + 1):
+			for idx, c in enumerate(critical[i]):
+				position[c] = idx
+		operators = [Sparse_Matrix.zeros((0, len(critical[0])))]
+		for i in range(1, self.dim + 1):
+			columns = [{position[face]: value for face, value in morse[c].items()} for c in critical[i]]
+			operators.append(Sparse_Matrix.from_columns(len(critical[i - 1]), columns))
+		operators.append(Sparse_Matrix.zeros((len(critical[self.dim]), 0)))
+
+		cells = [np.array(critical[i], dtype=np.int64) - offsets[i] for i in range(self.dim + 1)]
+		self._morse = (cells, operators)
+		return self._morse
 
 	'''
- 	Find the RREF of the matrix
-  	'''
+	Column reduce the integer matrix A without ever densifying it, giving its rank over the rationals.
+
+	Columns are processed left to right, and whenever two columns share the same lowest nonzero row, the later
+	one is replaced by the fraction-free combination a*col_j - b*col_i (divided by the gcd of its entries), so all
+	arithmetic stays exact. The same operations are applied to V, which starts as the identity, so that R = A V.
+	The nonzero columns of R span the image of A and the columns of V whose R column is zero span its kernel.
+ 	'''
 	@staticmethod
-	def rref(A):
-		mat = A.copy()
-		n = len(A)
-		m = len(A[0])
-		for col in range(0, m):
-			# For the current row, search for the elements in A are nonzero
-			i = col
-			for j in range(i, n):
-				if mat[j][col] != 0:
-					i = j
-					break
+	def column_reduce(A):
+		if not isinstance(A, Sparse_Matrix):
+			A = Sparse_Matrix.from_dense(A)
+		m = A.shape[1]
+
+		R = []
+		V = []
+		pivots = {}
+		for j in range(m):
+			col, ops = Simplicial_Complex._reduce_against(A.column(j), pivots, 0, {j: 1})
+			if col:
+				pivots[max(col)] = (col, ops)
+			R.append(col)
+			V.append(ops)
+
+		rank = len(pivots)
+		return rank, Sparse_Matrix.from_columns(A.shape[0], R), Sparse_Matrix.from_columns(m, V)
+
+	'''
+	Return the sparse column a*x + b*y, where x and y are dictionaries from row index to value
+ 	'''
+	@staticmethod
+	def _combine(a, x, b, y):
+		result = {row: a * value for row, value in x.items()} if a != 1 else dict(x)
+		for row, value in y.items():
+			value = result.get(row, 0) + b * value
+			if value:
+				result[row] = value
 			else:
-				# All the elements in this row are zero, so continue
+				result.pop(row, None)
+		return result
+
+	'''
+	Column reduce A over Z/2.
+
+	Every column is the set of rows holding an odd entry, so it takes memory proportional to its nonzero entries,
+	and adding two columns is their symmetric difference. The column operations V are kept as sets of column
+	indices as well, and R = A V mod 2.
+ 	'''
+	@staticmethod
+	def column_reduce_mod2(A):
+		if not isinstance(A, Sparse_Matrix):
+			A = Sparse_Matrix.from_dense(A)
+		m = A.shape[1]
+
+		R = []
+		V = []
+		pivots = {}
+		for j, col in enumerate(A.column_sets()):
+			col, ops = Simplicial_Complex._reduce_against(col, pivots, 2, {j})
+			if col:
+				pivots[max(col)] = (col, ops)
+			R.append(col)
+			V.append(ops)
+
+		rank = len(pivots)
+		return rank, Sparse_Matrix.from_sets(A.shape[0], R), Sparse_Matrix.from_sets(m, V)
+
+	'''
+	Rank of A, over the rationals (field 0) or over Z/2 (field 2), without keeping track of any basis.
+
+	Over Z/2, the columns are streamed one at a time from the sparse arrays and only the reduced pivot columns are
+	kept, as sets of rows, so the extra memory is proportional to the nonzero entries of those pivots (fill-in
+	included) and never to the full list of columns.
+	Over the rationals, the rank is the number of invariant factors of the integer Smith Normal Form
+ 	'''
+	@staticmethod
+	def matrix_rank(A, field=0):
+		if not isinstance(A, Sparse_Matrix):
+			A = Sparse_Matrix.from_dense(A)
+		if field != 2:
+			return len(Simplicial_Complex.smith_normal_form(A))
+
+		return len(Simplicial_Complex._pivot_rows_mod2(A))
+
+	'''
+	Reduce the columns of A over Z/2 one at a time and return the set of lowest rows of the reduced columns, whose
+	size is the rank. The columns in skip are left out: with delta_i, the lowest rows of the reduced delta_i+1 are
+	i-simplices whose columns would reduce to zero anyway (clearing)
+ 	'''
+	@staticmethod
+	def _pivot_rows_mod2(A, skip=()):
+		pivots = {}
+		for j, col in enumerate(A.column_sets()):
+			if j in skip:
+				continue
+			col = Simplicial_Complex._reduce_against(col, pivots, 2)
+			if col:
+				pivots[max(col)] = col
+		return set(pivots)
+
+	'''
+	Reduce a column against a dictionary of pivot columns, keyed by their lowest nonzero row, until its own lowest
+	row is not a pivot (or it vanishes). Over Z/2 columns are sets of rows, added in place by symmetric difference;
+	otherwise they are dictionaries from row to value and are combined fraction-free, divided by the gcd of their
+	entries.
+
+	To track the column operations, give V: the pivots then hold (column, V) pairs, the same operations are applied
+	to V and (col, V) is returned. Over Z/2, V can be a set of column indices or an integer bitmask
+ 	'''
+	@staticmethod
+	def _reduce_against(col, pivots, field, V=None):
+		while col:
+			low = max(col)
+			pivot = pivots.get(low)
+			if pivot is None:
+				break
+			if V is not None:
+				pivot, pivot_V = pivot
+			if field == 2:
+				col ^= pivot
+				if V is not None:
+					V ^= pivot_V
+				continue
+
+			# col <- a*col - b*pivot clears the entry at low
+			a = pivot[low]
+			b = col[low]
+			col = Simplicial_Complex._combine(a, col, -b, pivot)
+			if V is not None:
+				V = Simplicial_Complex._combine(a, V, -b, pivot_V)
+
+			# keep the coefficients from growing
+			g = 0
+			for value in col.values():
+				g = math.gcd(g, value)
+			if V is not None:
+				for value in V.values():
+					g = math.gcd(g, value)
+			if g > 1:
+				col = {row: value // g for row, value in col.items()}
+				if V is not None:
+					V = {row: value // g for row, value in V.items()}
+		return col if V is None else (col, V)
+
+	'''
+	Find Smith Normal Form of A over the integers, and return its invariant factors d_1 | d_2 | ... | d_rank.
+
+	The arithmetic is exact and fraction-free, and it runs in two stages. First, every entry equal to +1 or -1 is
+	used as a pivot on the sparse matrix: clearing its column with row operations and then its row with column
+	operations is unimodular, so the pivot contributes an invariant factor of 1 and the matrix shrinks to its Schur
+	complement, which stays integral. Boundary matrices are almost entirely made of such entries, so the coefficients
+	stay bounded and only a small remainder survives. That remainder is then put in Smith Normal Form densely with
+	python integers, by gcd steps (division with remainder) on whole rows and columns at a time.
+	'''
+	@staticmethod
+	def smith_normal_form(A):
+		if not isinstance(A, Sparse_Matrix):
+			A = Sparse_Matrix.from_dense(A)
+
+		# Keep the matrix both by rows and by columns so pivots and their rows can be found quickly
+		rows = {}
+		cols = {}
+		for j in range(A.shape[1]):
+			for row, value in A.column(j).items():
+				if value:
+					rows.setdefault(row, {})[j] = value
+					cols.setdefault(j, set()).add(row)
+
+		units = 0
+		progress = True
+		while progress:
+			progress = False
+			for col in sorted(cols, key=lambda c: len(cols[c])):
+				if col not in cols:
+					continue
+
+				# Among the unit entries of this column, pick the one on the shortest row to limit fill-in
+				pivot_row = None
+				for row in cols[col]:
+					if abs(rows[row][col]) == 1 and (pivot_row is None or len(rows[row]) < len(rows[pivot_row])):
+						pivot_row = row
+				if pivot_row is None:
+					continue
+
+				# Clear the column, row_r <- row_r - (a_rc / a_pc) row_p, which is exact as a_pc = +-1
+				pivot = rows.pop(pivot_row)
+				sign = pivot[col]
+				for row in cols.pop(col):
+					if row == pivot_row:
+						continue
+					current = rows[row]
+					factor = current[col] * sign
+					for c, value in pivot.items():
+						value = current.get(c, 0) - factor * value
+						if value:
+							if c not in current:
+								cols[c].add(row)
+							current[c] = value
+						elif c in current:
+							del current[c]
+							if c != col:
+								cols[c].discard(row)
+					if not current:
+						del rows[row]
+
+				# Clearing the pivot row is now a set of column operations that only touch the pivot row
+				for c in pivot:
+					if c != col:
+						cols[c].discard(pivot_row)
+						if not cols[c]:
+							del cols[c]
+				units += 1
+				progress = True
+
+		# What is left has no unit entries, so reduce it densely
+		remaining_rows = sorted(rows)
+		remaining_cols = sorted(cols)
+		D = np.zeros((len(remaining_rows), len(remaining_cols)), dtype=object)
+		col_position = {c: idx for idx, c in enumerate(remaining_cols)}
+		for idx, row in enumerate(remaining_rows):
+			for c, value in rows[row].items():
+				D[idx, col_position[c]] = value
+
+		return [1] * units + Simplicial_Complex._dense_invariant_factors(D)
+
+	'''
+	Invariant factors of a small dense integer matrix (numpy array of python integers)
+ 	'''
+	@staticmethod
+	def _dense_invariant_factors(D):
+		n, m = D.shape
+		factors = []
+		for t in range(min(n, m)):
+			nonzero = np.argwhere(D[t:, t:] != 0)
+			if len(nonzero) == 0:
+				break
+
+			while True:
+				# Move the smallest nonzero entry of the remaining block to (t, t)
+				block = D[t:, t:]
+				nonzero = np.argwhere(block != 0)
+				sizes = [abs(block[i, j]) for i, j in nonzero]
+				i, j = nonzero[int(np.argmin(sizes))]
+				D[[t, t + i]] = D[[t + i, t]]
+				D[:, [t, t + j]] = D[:, [t + j, t]]
+				pivot = D[t, t]
+
+				# Divide the rest of the pivot column and row by the pivot, leaving only remainders
+				quotients = D[t + 1:, t] // pivot
+				D[t + 1:] -= np.outer(quotients, D[t])
+				quotients = D[t, t + 1:] // pivot
+				D[:, t + 1:] -= np.outer(D[:, t], quotients)
+				if np.any(D[t + 1:, t] != 0) or np.any(D[t, t + 1:] != 0):
+					continue
+
+				# The pivot also has to divide everything left, otherwise bring an offending row up and repeat
+				offending = np.argwhere(D[t + 1:, t + 1:] % pivot != 0)
+				if len(offending) == 0:
+					break
+				D[t] += D[t + 1 + offending[0][0]]
+
+			factors.append(abs(D[t, t]))
+		return factors
+
+	'''
+	Find the RREF of the matrix, in floating point, with partial pivoting.
+
+	The columns are eliminated in panels of block columns. The pivots of a panel are picked by running the rank-1
+	kernel below on a copy of the panel alone; the k pivot rows are then solved against their k x k pivot block and
+	every other row is updated with one matrix product, so most of the work runs at BLAS speed. With block=1 every
+	column is cleared directly on the matrix by the rank-1 kernel. Entries below tol are treated as zero, which
+	defaults to the tolerance MATLAB uses, max(n, m) * eps * ||A||_inf
+	'''
+	@staticmethod
+	def rref(A, block=64, tol=None):
+		mat = np.array(A, dtype=float)
+		n, m = mat.shape
+		if tol is None:
+			tol = max(n, m) * np.finfo(float).eps * max(np.abs(mat).sum(axis=1).max(initial=0), 1)
+
+		# Preallocated buffers for the updates, so the loops below do not allocate
+		work = np.empty((n, m))
+		factors = np.empty(n)
+		buffer = np.empty(m)
+
+		rank = 0
+		if block <= 1:
+			for col in range(m):
+				if Simplicial_Complex._pivot(mat, rank, col, tol, buffer) is not None:
+					Simplicial_Complex._eliminate(mat, rank, col, work, factors)
+					rank += 1
+			return mat
+
+		for start in range(0, m, block):
+			stop = min(start + block, m)
+			if rank == n:
+				break
+
+			# Pick the pivots of the panel, remembering the row swaps
+			panel = mat[rank:, start:stop].copy()
+			swaps = []
+			pivots = []
+			for col in range(stop - start):
+				row = len(pivots)
+				swap = Simplicial_Complex._pivot(panel, row, col, tol, buffer)
+				if swap is None:
+					continue
+				swaps.append((rank + row, rank + swap))
+				pivots.append(start + col)
+				Simplicial_Complex._eliminate(panel, row, col, work, factors)
+			if not pivots:
+				mat[rank:, start:stop] = 0
 				continue
-			
-   			# Swap the row at i with the row associated with the column
-			irow = mat[i].copy()
-			mat[i] = mat[col]
-			mat[col] = irow
-   
-			# Reduce the row
-			mat[col - n] = mat[col - n]/mat[col - n][col]
-   
-			# Now that rows are swapped, put zeros on top and bottom
-			for row in range(0, n):
-				if row != col - n and mat[row][col] != 0:
-					mat[row] = mat[row] - mat[col] * mat[row][col]
+
+			for i, j in swaps:
+				Simplicial_Complex._swap_rows(mat, i, j, buffer)
+
+			# Solve the pivot rows against their pivot block, then clear the pivot columns from every other row
+			k = len(pivots)
+			upper = mat[rank:rank + k, start:]
+			upper[...] = np.linalg.solve(upper[:, np.array(pivots) - start], upper)
+			for rows in (slice(0, rank), slice(rank + k, n)):
+				lower = mat[rows, start:]
+				coefficients = mat[rows][:, pivots]
+				product = work[:lower.shape[0], :lower.shape[1]]
+				np.matmul(coefficients, upper, out=product)
+				np.subtract(lower, product, out=lower)
+
+			# What is left of the panel below the pivot rows is zero up to rounding
+			mat[:rank, pivots] = 0
+			mat[rank + k:, start:stop] = 0
+			mat[rank:rank + k, pivots] = np.eye(k)
+			rank += k
 		return mat
 
 	'''
- 	For every boundary operator (except the 0th), compute the Smith Normal Form and get the corresponding P, Q, and D
-  
-	The 0th homology group is simply the basis of the C_0
-  	'''
-	def compute_homology(self):
-		# the boundary operator d_0: C_0 -> 0
-		P = {}
-		Q = {}
+	Find the row of the largest entry of column col at or below row. If it is not below tol there is no pivot and
+	None is returned, otherwise it is swapped into place (through buffer) and its original row is returned
+	'''
+	@staticmethod
+	def _pivot(mat, row, col, tol, buffer):
+		if row >= mat.shape[0]:
+			return None
+		i = row + int(np.argmax(np.abs(mat[row:, col])))
+		if abs(mat[i, col]) <= tol:
+			mat[row:, col] = 0
+			return None
+		Simplicial_Complex._swap_rows(mat, row, i, buffer)
+		return i
+
+	@staticmethod
+	def _swap_rows(mat, i, j, buffer):
+		if i != j:
+			row = buffer[:mat.shape[1]]
+			np.copyto(row, mat[i])
+			mat[i] = mat[j]
+			mat[j] = row
+
+	'''
+	Scale the pivot row so the pivot is 1 and clear column col from every other row with a single rank-1 update,
+	in place. Only the columns from col on change, since everything to the left of the pivot in its row is zero
+	'''
+	@staticmethod
+	def _eliminate(mat, row, col, work, factors):
+		n, m = mat.shape
+		pivot_row = mat[row, col:]
+		pivot_row /= pivot_row[0]
+		column = factors[:n]
+		np.copyto(column, mat[:, col])
+		column[row] = 0
+		product = work[:n, :m - col]
+		np.multiply(column[:, None], pivot_row[None, :], out=product)
+		np.subtract(mat[:, col:], product, out=mat[:, col:])
+		mat[:, col] = 0
+		mat[row, col] = 1
+
+	'''
+	Compute the Betti numbers (and, with integer coefficients, the torsion) from the ranks of the boundary operators
+	alone. No change of basis is tracked, so this only needs memory proportional to the nonzero entries.
+
+	The i-th Betti number is dim C_i - rank delta_i - rank delta_i+1, and the invariant factors of delta_i+1 that are
+	larger than 1 give the torsion of H_i
+ 	'''
+	def betti_numbers(self):
+		if self._betti is not None:
+			return self._betti
+
+		if self.processes and not self.reduce and self._boundary_operator is None:
+			self._compute_in_parallel()
+			return self._betti
+
+		# The Morse complex has the same homology, so its smaller operators can stand in for the boundary operators
+		if self.reduce:
+			cells, operators = self.morse_complex()
+		else:
+			cells, operators = self.simplices, self.boundary_operator
+
 		rank = {}
-		for i in range(0, self.dim + 2):
-			ranki, Pi, Qi = Simplicial_Complex.smith_normal_form(self.boundary_operator[i])
-   
-			P[i] = Pi
-			Q[i] = Qi
-			rank[i] = ranki
-			#P.append(Pi)
-			#Q.append(Qi)
-			#rank.append(ranki)
-
-		# Get Z
-		Z = {}
-		for key in P:
-			Z[key - 1] = np.linalg.inv(P[key])[:, key:]
-   
-		# Get B
-		B = {}
-		for key in Q:
-			B[key] = (Q[key])[:, :len(Q[key]) - rank[key]]
+		torsion = [[] for i in range(0, self.dim + 1)]
+		cleared = set()
+		# Over Z/2 go from the top down, so each operator can skip the columns cleared by the one above it
+		for i in reversed(range(0, self.dim + 2)):
+			if self.field == 2:
+				cleared = Simplicial_Complex._pivot_rows_mod2(operators[i], cleared)
+				rank[i] = len(cleared)
+			else:
+				factors = Simplicial_Complex.smith_normal_form(operators[i])
+				rank[i] = len(factors)
+				if i > 0:
+					torsion[i - 1] = [d for d in factors if d > 1]
 
-  
-		# get G
-		G = {}
-		H = {}
-		for key in B:
-			if key in Z:
-				G[key] = np.hstack( (B[key], Z[key]) )
-    			# reduce B[i] and Z[i]
-				H[key] = np.hstack( (Simplicial_Complex.rref(B[key]), Simplicial_Complex.rref(Z[key])) )
-				print("\n\n\n")
-				print(B[key])
-				print(Z[key])
-   			
-		...
+		self._rank = rank
+		self._torsion = torsion
+		self._betti = [len(cells[i]) - rank[i] - rank[i + 1] for i in range(0, self.dim + 1)]
+		return self._betti
+
+	'''
+ 	Compute the homology groups. If bases is True, also column reduce every boundary operator to get the cycles Z
+	(the kernel of delta_i) and the boundaries B (the image of delta_i+1). Everything is kept sparse, so no matrix is
+	ever inverted or densified, but the bases are only materialized when asked for.
+
+	The same reductions give a representative cycle for every class, stored in self.generators[i]: column j of V_i
+	is a cycle when column j of R_i is zero, and it is a boundary exactly when the i-simplex j is the lowest row of a
+	reduced column of delta_i+1. The cycles that are not are integer chains over the i-simplices whose classes form a
+	basis of the free part of H_i (of all of H_i over Z/2). Torsion classes are not included, since they are
+	boundaries over the rationals
+  	'''
+	def compute_homology(self, bases=False):
+		self.betti_numbers()
+
+		if bases and (self._Z is None or self._generators is None):
+			Z = {}
+			B = {}
+			cycles = {}
+			generators = {}
+			for i in range(0, self.dim + 2):
+				if self.field == 2:
+					ranki, Ri, Vi = Simplicial_Complex.column_reduce_mod2(self.boundary_operator[i])
+				else:
+					ranki, Ri, Vi = Simplicial_Complex.column_reduce(self.boundary_operator[i])
+				zero = np.diff(Ri.indptr) == 0
+
+				# the columns of V that R sends to zero are the cycles of C_i
+				if i <= self.dim:
+					cycles[i] = np.flatnonzero(zero)
+					Z[i] = Vi.select(cycles[i])
+
+				# the nonzero columns of R are the boundaries in C_i-1, and the rows are sorted so the last entry of
+				# every column is its lowest row
+				if i > 0:
+					nonzero = np.flatnonzero(~zero)
+					B[i - 1] = Ri.select(nonzero)
+					lows = Ri.indices[Ri.indptr[nonzero + 1] - 1]
+					generators[i - 1] = V_below.select(cycles[i - 1][~np.isin(cycles[i - 1], lows)])
+				V_below = Vi
+			self._Z = Z
+			self._B = B
+			self._generators = generators
+
+	'''
+	Write the representative cycles of H_i as lists of (simplex, coefficient) pairs, with simplices given by labels
+	'''
+	def generator_chains(self, i):
+		generators = self.generators[i]
+		chains = []
+		for j in range(generators.shape[1]):
+			chain = generators.column(j)
+			chains.append([(self.vertex_labels(self.simplices[i][row]), int(value))
+				for row, value in sorted(chain.items())])
+		return chains
+
+	'''
+	Describe every homology group as a string, such as "H_1 = Z^2 + Z/2"
+ 	'''
+	def homology_groups(self):
+		ring = "Z/2" if self.field == 2 else "Z"
+		groups = []
+		for i in range(0, self.dim + 1):
+			summands = []
+			if self.betti[i] == 1:
+				summands.append(ring)
+			elif self.betti[i] > 1:
+				summands.append("{}^{}".format(ring, self.betti[i]))
+			summands.extend("Z/{}".format(d) for d in self.torsion[i])
+			groups.append("H_{} = {}".format(i, " + ".join(summands) if summands else "0"))
+		return groups
+
+	'''
+	Compute a cocycle representative for every class of the cohomology H^k, for every k.
+
+	The coboundary delta^k: C^k -> C^k+1 is the transpose of delta_k+1, so it is built from the boundary operators
+	already computed. The coboundaries are reduced by increasing dimension, tracking the column operations V, and a
+	zero column of the reduced delta^k gives a cocycle V_j. When the lowest row of a reduced column of delta^k-1 is
+	the k-simplex j, the cocycle of j is a coboundary, so column j of delta^k is cleared without being reduced and
+	does not give a class. The remaining cocycles form a basis of H^k, stored as the columns of self.cocycles[k]
+ 	'''
+	def compute_cohomology(self):
+		if self._cocycles is not None:
+			return self._cocycles
+
+		cocycles = {}
+		self._coboundary_pivots = {}
+		cleared = set()
+		for k in range(0, self.dim + 1):
+			coboundary = self.boundary_operator[k + 1].transpose()
+			if self.field == 2:
+				columns = coboundary.column_sets()
+			else:
+				columns = (coboundary.column(j) for j in range(coboundary.shape[1]))
+
+			pivots = {}
+			representatives = []
+			for j, col in enumerate(columns):
+				if j in cleared:
+					continue
+				col, V = Simplicial_Complex._reduce_against(col, pivots, self.field, {j} if self.field == 2 else {j: 1})
+				if col:
+					pivots[max(col)] = (col, V)
+				else:
+					representatives.append(V)
+
+			if self.field == 2:
+				cocycles[k] = Sparse_Matrix.from_sets(len(self.simplices[k]), representatives)
+			else:
+				cocycles[k] = Sparse_Matrix.from_columns(len(self.simplices[k]), representatives)
+			self._coboundary_pivots[k] = pivots
+			cleared = set(pivots)
+
+		self._cocycles = cocycles
+		return cocycles
+
+	@property
+	def cocycles(self):
+		return self.compute_cohomology()
+
+	'''
+	Compute the cup products of the basis of H^1 over Z/2.
+
+	For cocycles a and b, (a u b)[v_0, v_1, v_2] = a[v_0, v_1] b[v_1, v_2], evaluated on all the triangles at once.
+	The product is then written in the basis of H^2 by reducing it against the reduced coboundaries of delta^1 (which
+	span the coboundaries) and the cocycle representatives of H^2. The result is an array of shape (b_1, b_1, b_2),
+	where [x, y] holds the coordinates of the product of the x-th and y-th classes of H^1
+ 	'''
+	def cup_products(self):
+		assert self.field == 2, "Cup products are only computed with Z/2 coefficients"
+		cocycles = self.compute_cohomology()
+		b1 = cocycles[1].shape[1] if self.dim >= 1 else 0
+		b2 = cocycles[2].shape[1] if self.dim >= 2 else 0
+		products = np.zeros((b1, b1, b2), dtype=np.uint8)
+		if b1 == 0 or b2 == 0:
+			return products
+
+		# The edges [v_0, v_1] and [v_1, v_2] of every triangle
+		faces = self.faces(2)
+		front = self.find(1, faces[:, 2])
+		back = self.find(1, faces[:, 0])
+		classes = cocycles[1].to_dense().astype(bool)
+
+		# A basis of Z^2 that remembers which classes of H^2 every vector is made of
+		pivots = {low: (col, 0) for low, (col, V) in self._coboundary_pivots[1].items()}
+		for idx, col in enumerate(cocycles[2].column_sets()):
+			col, tag = Simplicial_Complex._reduce_against(col, pivots, 2, 1 << idx)
+			if col:
+				pivots[max(col)] = (col, tag)
+
+		for x in range(b1):
+			for y in range(b1):
+				col = set(np.flatnonzero(classes[front, x] & classes[back, y]).tolist())
+				tag = Simplicial_Complex._reduce_against(col, pivots, 2, 0)[1]
+				for z in range(b2):
+					products[x, y, z] = (tag >> z) & 1
+		return products
+
+	'''
+	Save the class into a directory of .npy files, one array per file, with a small meta.json alongside.
+
+	The simplices, their sorted index and the boundary operators are always written; the ranks, Betti numbers,
+	torsion and the bases Z and B are written if they have been computed
+ 	'''
+	def save(self, directory):
+		os.makedirs(directory, exist_ok=True)
+		meta = {'class': type(self).__name__, 'dim': self.dim, 'field': self.field, 'reduce': self.reduce}
+
+		for i in range(self.dim + 1):
+			if self.recent_keys[i]:
+				self._index_dimension(i)
+			np.save(os.path.join(directory, 'simplices_{}.npy'.format(i)), self.simplices[i])
+			np.save(os.path.join(directory, 'order_{}.npy'.format(i)), self.key_order[i])
+			np.save(os.path.join(directory, 'sorted_{}.npy'.format(i)), self.simplices[i][self.key_order[i]])
+		for i, delta in enumerate(self.boundary_operator):
+			delta.save(os.path.join(directory, 'boundary_{}'.format(i)))
+
+		# Labels that numpy can hold as a plain array can be memory-mapped, the others are pickled
+		meta['labels'] = self.labels is not None
+		if self.labels is not None:
+			labels = np.empty(len(self.labels), dtype=object)
+			labels[:] = self.labels
+			if all(isinstance(label, str) for label in self.labels):
+				labels = labels.astype(str)
+			elif all(isinstance(label, (int, np.integer)) for label in self.labels):
+				labels = labels.astype(np.int64)
+			np.save(os.path.join(directory, 'labels.npy'), labels, allow_pickle=True)
+
+		if self._betti is not None:
+			meta['rank'] = {str(i): int(r) for i, r in self._rank.items()}
+			meta['betti'] = [int(b) for b in self._betti]
+			if self._torsion is not None:
+				meta['torsion'] = [[int(d) for d in factors] for factors in self._torsion]
+		meta['bases'] = self._Z is not None
+		if self._Z is not None:
+			for i, Zi in self._Z.items():
+				Zi.save(os.path.join(directory, 'Z_{}'.format(i)))
+			for i, Bi in self._B.items():
+				Bi.save(os.path.join(directory, 'B_{}'.format(i)))
+		meta['generators'] = self._generators is not None
+		if self._generators is not None:
+			for i, Gi in self._generators.items():
+				Gi.save(os.path.join(directory, 'generators_{}'.format(i)))
+
+		self._save_extra(directory, meta)
+		with open(os.path.join(directory, 'meta.json'), 'w') as file:
+			json.dump(meta, file)
+
+	def _save_extra(self, directory, meta):
+		pass
+
+	'''
+	Load a class saved by save(). With mmap=True (the default) every array is memory-mapped read-only, so nothing is
+	read or copied until it is used, and processes loading the same directory share the pages
+ 	'''
+	@staticmethod
+	def load(directory, mmap=True):
+		complex = Simplicial_Complex.__new__(Simplicial_Complex)
+		complex._load(directory, mmap)
+		return complex
+
+	def _load(self, directory, mmap):
+		mmap_mode = 'r' if mmap else None
+		with open(os.path.join(directory, 'meta.json')) as file:
+			meta = json.load(file)
+		assert meta['class'] == type(self).__name__, "{} holds a {}".format(directory, meta['class'])
+
+		self.field = meta['field']
+		self.reduce = meta['reduce']
+		self.processes = None
+		self.dim = meta['dim']
+		self.labels = None
+		self.label_ids = None
+		if meta['labels']:
+			labels = np.load(os.path.join(directory, 'labels.npy'), allow_pickle=True)
+			self.labels = labels.tolist()
+			self.label_ids = {label: idx for idx, label in enumerate(self.labels)}
+
+		self.simplices = []
+		self.key_order = []
+		self.sorted_keys = []
+		self.recent_keys = []
+		for i in range(self.dim + 1):
+			self.simplices.append(np.load(os.path.join(directory, 'simplices_{}.npy'.format(i)), mmap_mode=mmap_mode))
+			self.key_order.append(np.load(os.path.join(directory, 'order_{}.npy'.format(i)), mmap_mode=mmap_mode))
+			sorted_rows = np.load(os.path.join(directory, 'sorted_{}.npy'.format(i)), mmap_mode=mmap_mode)
+			self.sorted_keys.append(Simplicial_Complex._keys(sorted_rows))
+			self.recent_keys.append({})
+		self._buffers = list(self.simplices)
+
+		self.invalidate()
+		self._boundary_operator = [Sparse_Matrix.load(os.path.join(directory, 'boundary_{}'.format(i)), mmap_mode)
+			for i in range(self.dim + 2)]
+		if 'betti' in meta:
+			self._rank = {int(i): r for i, r in meta['rank'].items()}
+			self._betti = meta['betti']
+			self._torsion = meta.get('torsion')
+		if meta['bases']:
+			self._Z = {i: Sparse_Matrix.load(os.path.join(directory, 'Z_{}'.format(i)), mmap_mode)
+				for i in range(self.dim + 1)}
+			self._B = {i: Sparse_Matrix.load(os.path.join(directory, 'B_{}'.format(i)), mmap_mode)
+				for i in range(self.dim + 1)}
+		if meta.get('generators'):
+			self._generators = {i: Sparse_Matrix.load(os.path.join(directory, 'generators_{}'.format(i)), mmap_mode)
+				for i in range(self.dim + 1)}
+		self._load_extra(directory, meta, mmap_mode)
+
+	def _load_extra(self, directory, meta, mmap_mode):
+		pass
+
+
+'''
+Build delta_i in a worker process from the simplex arrays in shared memory, and reduce it if a field is given: over
+Z/2 the rank is returned, and over the integers the invariant factors
+'''
+def _parallel_task(task):
+	i, upper_spec, lower_spec, field = task
+	upper_memory = shared_memory.SharedMemory(name=upper_spec[0])
+	lower_memory = shared_memory.SharedMemory(name=lower_spec[0])
+	try:
+		upper = np.ndarray(upper_spec[1], dtype=np.int32, buffer=upper_memory.buf)
+		lower = np.ndarray(lower_spec[1], dtype=np.int32, buffer=lower_memory.buf)
+		delta = Simplicial_Complex.boundary_from_arrays(upper, lower)
+		del upper, lower
+	finally:
+		upper_memory.close()
+		lower_memory.close()
+
+	if field is None:
+		return i, delta, None
+	if field == 2:
+		return i, delta, Simplicial_Complex.matrix_rank(delta, field=2)
+	return i, delta, Simplicial_Complex.smith_normal_form(delta)
+
+
+class Sparse_Matrix:
+	'''
+	An integer matrix stored in compressed sparse column (CSC) form. The entries of column j are
+	data[indptr[j]:indptr[j + 1]], and they sit in the rows indices[indptr[j]:indptr[j + 1]]
+	'''
+	def __init__(self, shape, indptr, indices, data):
+		self.shape = (int(shape[0]), int(shape[1]))
+		self.indptr = np.asarray(indptr, dtype=np.int64)
+		self.indices = np.asarray(indices, dtype=np.int64)
+		self.data = np.asarray(data)
+
+	'''
+	The all zero matrix of the given shape
+	'''
+	@staticmethod
+	def zeros(shape):
+		return Sparse_Matrix(shape, np.zeros(shape[1] + 1), [], np.zeros(0, dtype=np.int8))
+
+	'''
+	Build the matrix from a list of columns, each a dictionary from row index to value.
+	If no dtype is given, int64 is used unless some entry does not fit, in which case python integers are kept
+	'''
+	@staticmethod
+	def from_columns(n_rows, columns, dtype=None):
+		indptr = np.zeros(len(columns) + 1, dtype=np.int64)
+		indices = []
+		data = []
+		for j, column in enumerate(columns):
+			for row in sorted(column):
+				indices.append(row)
+				data.append(column[row])
+			indptr[j + 1] = len(indices)
+
+		if dtype is None:
+			dtype = np.int64
+			if data and max(abs(value) for value in data) >= 2**63:
+				dtype = object
+		return Sparse_Matrix((n_rows, len(columns)), indptr, indices, np.array(data, dtype=dtype))
+
+	'''
+	Build a 0/1 matrix from columns given as sets of row indices
+	'''
+	@staticmethod
+	def from_sets(n_rows, columns):
+		indptr = np.zeros(len(columns) + 1, dtype=np.int64)
+		indices = []
+		for j, column in enumerate(columns):
+			indices.extend(sorted(column))
+			indptr[j + 1] = len(indices)
+		return Sparse_Matrix((n_rows, len(columns)), indptr, indices, np.ones(len(indices), dtype=np.int8))
+
+	'''
+	Build the matrix from a dense array (mostly for small examples)
+	'''
+	@staticmethod
+	def from_dense(A):
+		A = np.asarray(A)
+		columns = []
+		for j in range(A.shape[1]):
+			columns.append({int(row): int(A[row, j]) for row in np.flatnonzero(A[:, j])})
+		return Sparse_Matrix.from_columns(A.shape[0], columns)
+
+	@property
+	def nnz(self):
+		return len(self.indices)
+
+	'''
+	Return the j-th column as a dictionary from row index to value
+	'''
+	def column(self, j):
+		start, end = self.indptr[j], self.indptr[j + 1]
+		return {int(row): int(value) for row, value in zip(self.indices[start:end], self.data[start:end])}
+
+	'''
+	Return the transpose, also in CSC form, by sorting the entries by row
+	'''
+	def transpose(self):
+		order = np.argsort(self.indices, kind='stable')
+		columns = np.repeat(np.arange(self.shape[1]), np.diff(self.indptr))
+		indptr = np.concatenate(([0], np.cumsum(np.bincount(self.indices, minlength=self.shape[0]))))
+		return Sparse_Matrix((self.shape[1], self.shape[0]), indptr, columns[order], self.data[order])
+
+	'''
+	Yield every column reduced mod 2, as the set of rows holding an odd entry. The columns are read one at a time
+	from the CSC arrays, so only the column being used is ever held as a set
+	'''
+	def column_sets(self):
+		odd = (self.data % 2) != 0
+		indices = self.indices
+		indptr = self.indptr
+		if not odd.all():
+			indices = indices[odd]
+			indptr = np.concatenate(([0], np.cumsum(odd)))[indptr]
+		for j in range(self.shape[1]):
+			yield set(indices[indptr[j]:indptr[j + 1]].tolist())
+
+	'''
+	Return the matrix made of the given columns, in order
+	'''
+	def select(self, columns):
+		return Sparse_Matrix.from_columns(self.shape[0], [self.column(j) for j in columns], dtype=self.data.dtype)
+
+	'''
+	Expand into a dense array. Only meant for printing and checking small examples
+	'''
+	def to_dense(self):
+		dense = np.zeros(self.shape, dtype=self.data.dtype)
+		for j in range(self.shape[1]):
+			start, end = self.indptr[j], self.indptr[j + 1]
+			dense[self.indices[start:end], j] = self.data[start:end]
+		return dense
+
+	'''
+	Save the matrix as prefix_shape.npy, prefix_indptr.npy, prefix_indices.npy and prefix_data.npy
+	'''
+	def save(self, prefix):
+		np.save(prefix + '_shape.npy', np.array(self.shape, dtype=np.int64))
+		np.save(prefix + '_indptr.npy', self.indptr)
+		np.save(prefix + '_indices.npy', self.indices)
+		np.save(prefix + '_data.npy', self.data, allow_pickle=self.data.dtype == object)
+
+	'''
+	Load a matrix saved by save(), memory-mapping its arrays if mmap_mode is given
+	'''
+	@staticmethod
+	def load(prefix, mmap_mode=None):
+		shape = np.load(prefix + '_shape.npy')
+		data = np.load(prefix + '_data.npy', mmap_mode=mmap_mode, allow_pickle=True)
+		return Sparse_Matrix(shape, np.load(prefix + '_indptr.npy', mmap_mode=mmap_mode),
+			np.load(prefix + '_indices.npy', mmap_mode=mmap_mode), data)
+
+	def __repr__(self):
+		return "Sparse_Matrix(shape={}, nnz={})".format(self.shape, self.nnz)
 
 if __name__ == '__main__':
     # valid simplicial complex
 	print("Triangle\n")
 	K_list = [['A'], ['B'], ['C'], ['A', 'B', 'C'], ['A', 'B'], ['B', 'C'], ['C', 'A'], ['D']]
 	K = Simplicial_Complex(K_list)
+	print(", ".join(K.homology_groups()))
  	
 	# not valid simplicial complex, throws assertion error
 	# K_prime_list = [['A'], ['B'], ['C'], ['A', 'B', 'C'], ['A', 'B'], ['B', 'C']]
@@ -276,6 +1638,7 @@ if __name__ == '__main__':
 	print("\n\n\nLine\n")
 	K_line_list = [['A'], ['B'], ['C'], ['D'], ['E'], ['A', 'B'], ['B', 'C'], ['C', 'D'], ['D', 'E']]
 	K_line = Simplicial_Complex(K_line_list)
+	print(", ".join(K_line.homology_groups()))
 
 	print("\n\n\nTorus\n")
 	
@@ -309,7 +1672,12 @@ if __name__ == '__main__':
 	torus = torus_vertices + torus_edges + torus_faces
 	torus = list(map(list, set(map(tuple, torus))))
 	#print(torus)
-	#torus_complex = Simplicial_Complex(torus)
+	torus_complex = Simplicial_Complex(torus)
+	print(", ".join(torus_complex.homology_groups()))
+
+	# The two classes of H^1 of the torus cup to the class of H^2, and each of them squares to zero
+	torus_mod2 = Simplicial_Complex(torus, field=2)
+	print("Cup products on H^1:", torus_mod2.cup_products()[:, :, 0].tolist())
 
 	#Simplicial_Complex.smith_normal_form(np.array([[1, 2, 3], [4, 5, 6]]))
 	Simplicial_Complex.smith_normal_form(np.array([[1, 2, 3, 4], [5, 6, 7, 8]]))
@@ -2,6 +2,16 @@ import numpy as np
 
 # This class is a rudementary Neural Netowrk.
 class BasicNeuralNetwork:
+
+    # The binary model format starts with MAGIC, then holds the number of layers, the data type of the
+    # weights as a numpy dtype string and the size of every layer, as little endian 32 bit integers.
+    # Then come the weight matrices and bias vectors as raw row-major arrays, each starting at a multiple of ALIGN
+    MAGIC = b'BNN\x01'
+    ALIGN = 64
+
+    # Weights stored in another type than compute_dtype are converted about CHUNK elements (1MB of float32)
+    # at a time. Smaller chunks save little memory but make the products too small to be fast
+    CHUNK = 1 << 18
     
     # In initialization, the network is established.
     # For n layers, n-1 weight matrices are used and n-1 bias "vector" are made
@@ -12,16 +22,73 @@ class BasicNeuralNetwork:
     # matrix of dimension (1 x input_size).
     # The dimensions of each weight matrices are (previous_layer_size x next_layer_size)
     # The dimension of each bias "vectors" are (1 x next_layer_size)
-    def __init__(self,*args):
-        np.random.seed(100)
+    # The weights and biases are stored as dtype. With float16 they only take half the memory of float32,
+    # but every product and every gradient is still computed in float32 (see set_dtype)
+    # The weights start out random, drawn from a normal distribution of variance 2 / previous_layer_size
+    # (He initialization, which suits the ReLU), and the biases at zero. Equal weights would give every unit
+    # of a layer the same gradient, so they would never become different. seed makes it reproducible
+    def __init__(self,*args, dtype=np.float64, seed=100):
+        rng = np.random.default_rng(seed)
+        self.set_dtype(dtype)
         self.weight_layers = []
         self.bias_layers = []
         if len(args) > 0:
             for idx in range(len(args) - 1):
-                self.weight_layers.append(np.ones((args[idx], args[idx + 1])) - 0.5)
-                self.bias_layers.append(np.ones((1, args[idx + 1])) - 0.5)
+                scale = np.sqrt(2 / args[idx])
+                self.weight_layers.append((rng.standard_normal((args[idx], args[idx + 1])) * scale).astype(self.dtype))
+                self.bias_layers.append(np.zeros((1, args[idx + 1]), dtype=self.dtype))
         self.n_layers = args
 
+    # dtype is the type the weights are stored as and compute_dtype the one the arithmetic is done in,
+    # which is the same except for float16, which is computed in float32. float16 saves memory, not time:
+    # every pass converts the weights chunk by chunk, and a training step rounds them back as well
+    def set_dtype(self, dtype):
+        self.dtype = np.dtype(dtype)
+        self.compute_dtype = np.dtype(np.float32) if self.dtype == np.float16 else self.dtype
+        self.buffer_size = 0
+        self.gradient_shapes = None
+        self.scratch = None
+
+    # change the type the weights are stored as
+    def astype(self, dtype):
+        self.set_dtype(dtype)
+        self.weight_layers = [weight.astype(self.dtype) for weight in self.weight_layers]
+        self.bias_layers = [bias.astype(self.dtype) for bias in self.bias_layers]
+        return self
+
+    # the weights of layer idx in compute_dtype, a few rows at a time, as (rows, chunk) pairs.
+    # Every chunk is converted into the same small scratch buffer, which is allocated once, so there is never
+    # a converted copy of a whole weight matrix. A chunk is only valid until the next one is asked for
+    def weight_chunks(self, idx):
+        weight = self.weight_layers[idx]
+        width = weight.shape[1]
+        if self.scratch is None or len(self.scratch) < 2 * max(BasicNeuralNetwork.CHUNK, width):
+            self.scratch = np.empty(2 * max(BasicNeuralNetwork.CHUNK, max(w.shape[1] for w in self.weight_layers)),
+                                    dtype=self.compute_dtype)
+        step = max(1, BasicNeuralNetwork.CHUNK // width)
+        for start in range(0, len(weight), step):
+            rows = slice(start, min(start + step, len(weight)))
+            chunk = self.scratch[:(rows.stop - start) * width].reshape(-1, width)
+            np.copyto(chunk, weight[rows])
+            yield rows, chunk
+
+    # the product Z W of a batch Z with the weights W of layer idx, written into out.
+    # When the weights are stored in compute_dtype this is a single product, otherwise the products with
+    # every chunk of rows of W are added up, through tmp (an array shaped like out)
+    def multiply(self, Z, idx, out=None, tmp=None):
+        weight = self.weight_layers[idx]
+        if out is None:
+            out = np.empty(np.shape(Z)[:-1] + (weight.shape[1],), dtype=self.compute_dtype)
+        if weight.dtype == self.compute_dtype:
+            return np.matmul(Z, weight, out=out)
+
+        tmp = np.empty_like(out) if tmp is None else tmp
+        out[...] = 0
+        for rows, chunk in self.weight_chunks(idx):
+            np.matmul(Z[..., rows], chunk, out=tmp)
+            out += tmp
+        return out
+
     # NOT TO BE USED AT ALL LMAO. I DID IT JUST TO CONFIRM MY CLASS WORKS
     def reveal(self):
         for weight in self.weight_layers:
@@ -30,10 +97,18 @@ class BasicNeuralNetwork:
             print(bias,'\n\n')
         print(self.n_layers)
 
-    # This loads up
-    def load(self, filename):
+    # This loads up a model saved by save, in either format.
+    # Binary models are memory mapped with mmap_mode (see load_binary) and keep the type they were saved as,
+    # text models are stored as dtype, or as the current type of the model when dtype is None
+    def load(self, filename, mmap_mode='c', dtype=None):
+        if dtype is not None:
+            self.set_dtype(dtype)
         if self.n_layers != 0:
             print("warning, the current network is going to be discarded")
+        with open(filename, 'rb') as file:
+            if file.read(len(BasicNeuralNetwork.MAGIC)) == BasicNeuralNetwork.MAGIC:
+                return self.load_binary(filename, mmap_mode)
+
         # set all the variables to zero
         self.weight_layers = []
         self.bias_layers = []
@@ -64,7 +139,7 @@ class BasicNeuralNetwork:
                 arrow = lines[line_idx + i].split('\t')[:-1]
                 for j in range(len(arrow)):
                     current_wmat[i][j] = float(arrow[j])
-            self.weight_layers.append(current_wmat)
+            self.weight_layers.append(current_wmat.astype(self.dtype))
             line_idx += row
         line_idx += 1
         # load the basis vectors
@@ -73,10 +148,66 @@ class BasicNeuralNetwork:
             arrow = lines[line_idx].split('\t')[:-1]
             for j in range(len(arrow)):
                 current_bvec[0][j] = float(arrow[j])
-            self.bias_layers.append(current_bvec)
+            self.bias_layers.append(current_bvec.astype(self.dtype))
             line_idx += 1
 
-    def save(self, filename):
+    # the offset of every array of a binary model with the given layer sizes, and the size of the whole file
+    def binary_layout(n_layers, dtype):
+        def align(offset):
+            return -(-offset // BasicNeuralNetwork.ALIGN) * BasicNeuralNetwork.ALIGN
+
+        shapes = [(n_layers[idx], n_layers[idx + 1]) for idx in range(len(n_layers) - 1)]
+        shapes += [(1, n_layers[idx + 1]) for idx in range(len(n_layers) - 1)]
+        offsets = []
+        offset = align(len(BasicNeuralNetwork.MAGIC) + 4 + 8 + 4 * len(n_layers))
+        for shape in shapes:
+            offsets.append(offset)
+            offset = align(offset + shape[0] * shape[1] * dtype.itemsize)
+        return shapes, offsets, offset
+
+    # load a binary model by memory mapping the file, so startup does not read the weights and every
+    # process that loads the same file shares one copy of them in memory.
+    # With mmap_mode 'c' (copy on write) the pages of a model that gets trained are copied as they change,
+    # with 'r' the weights are read only, and with None they are read into memory
+    def load_binary(self, filename, mmap_mode='c'):
+        with open(filename, 'rb') as file:
+            header = file.read(len(BasicNeuralNetwork.MAGIC) + 12)
+            count = int(np.frombuffer(header, dtype='<u4', count=1, offset=len(BasicNeuralNetwork.MAGIC))[0])
+            dtype = np.dtype(header[-8:].rstrip(b'\x00').decode())
+            self.n_layers = [int(size) for size in np.frombuffer(file.read(4 * count), dtype='<u4')]
+        self.set_dtype(dtype)
+
+        shapes, offsets, size = BasicNeuralNetwork.binary_layout(self.n_layers, dtype)
+        if mmap_mode is None:
+            content = np.fromfile(filename, dtype=np.uint8)
+        else:
+            content = np.memmap(filename, dtype=np.uint8, mode=mmap_mode)
+        if len(content) < size:
+            raise Exception("The model file is truncated")
+        arrays = [np.ndarray(shape, dtype=dtype, buffer=content, offset=offset)
+                  for shape, offset in zip(shapes, offsets)]
+        self.weight_layers = arrays[:len(arrays) // 2]
+        self.bias_layers = arrays[len(arrays) // 2:]
+
+    # save the model in the binary format, with the weights stored as dtype (the type of the model by default)
+    def save_binary(self, filename, dtype=None):
+        dtype = self.dtype if dtype is None else np.dtype(dtype)
+        n_layers = list(self.n_layers)
+        shapes, offsets, size = BasicNeuralNetwork.binary_layout(n_layers, dtype)
+        with open(filename, 'wb') as file:
+            file.write(BasicNeuralNetwork.MAGIC)
+            file.write(np.array([len(n_layers)], dtype='<u4').tobytes())
+            file.write(dtype.str.encode().ljust(8, b'\x00'))
+            file.write(np.array(n_layers, dtype='<u4').tobytes())
+            for array, offset in zip(self.weight_layers + self.bias_layers, offsets):
+                file.write(bytes(offset - file.tell()))
+                np.ascontiguousarray(array, dtype=dtype).tofile(file)
+            file.write(bytes(size - file.tell()))
+
+    # save the model as text, or in the binary format when binary is True or the file name ends with .bnn
+    def save(self, filename, binary=None):
+        if binary or (binary is None and filename.endswith('.bnn')):
+            return self.save_binary(filename)
         file = open(filename, "w")
         
         for arg in self.n_layers:
@@ -113,106 +244,222 @@ class BasicNeuralNetwork:
             raise Exception("The number of inputs does not fit the model")
         Z = [input]
         for idx in range(len(self.weight_layers)):
-            A = np.matmul(Z[idx], self.weight_layers[idx]) + self.bias_layers[idx]
+            A = self.multiply(Z[idx], idx) + self.bias_layers[idx]
             Z.append(BasicNeuralNetwork.transform(A))
         return Z
 
     '''
     This is the met of the Neural Network. The training algorithm is a gradient descent. The basic idea is
     using the chain rule on smooth manifolds to find the gradient of the error function at a given "input". However,
-    crucially, our input in this case is a simple matrix which 
+    crucially, our input in this case is a simple matrix which holds a whole mini-batch, one sample per row,
+    and the gradient is backpropagated through the layers (see backward).
+
+    The training data is either given as two arrays of inputs and outputs, which are cut into mini-batches of
+    batch_size rows (in a new random order every epoch when shuffle is True), or as a DataLoader (or any other
+    iterable of (inputs, outputs) mini-batches that can be run through once per epoch).
+    The learning rate of every epoch is schedule(epoch), or learning_rate when there is no schedule.
+    Every mini-batch is one forward and one backward pass through activation buffers allocated once.
+    Returns the mean error of every epoch
     '''
-    def train(self, train_data_inputs, train_data_outputs):
-        if len(train_data_inputs) != len(train_data_outputs):
+    def train(self, train_data_inputs, train_data_outputs=None, epochs=1, batch_size=32, shuffle=True,
+              learning_rate=0.01, schedule=None, seed=None, verbose=False):
+        if train_data_outputs is not None and len(train_data_inputs) != len(train_data_outputs):
             print('# of train inputs: ', len(train_data_inputs))
             print('# of train outputs: ', len(train_data_outputs))
             raise Exception("The number of inputs does not match the number of outputs")
 
-        n_loops = 1
-
-        for loop in range(n_loops):
-            n_of_layers = len(self.n_layers)
-
-            input = train_data_inputs
-            correct_output = train_data_outputs
-            intermediate_outputs = [input]
-            for j in range(n_of_layers - 1):
-                A = np.matmul(intermediate_outputs[j], self.weight_layers[j]) + self.bias_layers[j]
-                intermediate_outputs.append(BasicNeuralNetwork.transform(A))
-            # backpropagate with intermediate outputs
-            ideal_output = [0 for i in range(n_of_layers)]
-            ideal_output[-1] = correct_output
-
-            momentum_w = 0
-            momentum_b = 0
-            gamma = 0.01
-
-            # print(len(intermediate_outputs))
-            for j in range(-1, -n_of_layers, -1):
-                #print(ideal_output[j])
-                # breakpoint()
-                dE = (intermediate_outputs[j] - ideal_output[j]) / len(train_data_inputs)
-                if type(intermediate_outputs[j]) == type([1, 2]):
-                    #print(intermediate_outputs[j])
-                    print(type(input))
-                dy = BasicNeuralNetwork.dtransform(intermediate_outputs[j])
-                
-                grad_w = np.matmul(np.transpose(dE * dy), intermediate_outputs[j - 1]).T
-                #print(np.shape(dE))
-                #print(np.shape(dy))
-                #print(np.shape(intermediate_outputs[j - 1]))
-                    
-                #print(np.shape(grad_w))
-                #print(np.shape(sum(grad_w)))
-
-                grad_b = dE * dy * 1
-                #print(np.shape(grad_b))
-                #print(np.shape(sum(grad_b)))
-                
-
-                #momentum_w = 0.08*momentum_w + grad_w
-                #momentum_b = 0.08*momentum_b + sum(grad_b)
-                #breakpoint()
-                momentum_w = grad_w
-                momentum_b = sum(grad_b)
-                
-                self.weight_layers[j] = self.weight_layers[j] - gamma * (momentum_w)
-                
-                self.bias_layers[j] = self.bias_layers[j] - gamma * (momentum_b)
-
-                if j != -n_of_layers:
-                    #print(np.shape(dE * dy))
-                    #print(np.shape(intermediate_outputs[j - 1]))
-                    #print(np.shape(self.weight_layers[j]))
-                    grad_x = np.matmul(dE * dy, np.transpose(self.weight_layers[j])) # intermediate_outputs[j - 1]
-                    #print(np.shape(grad_x))
-                    ideal_output[j - 1] = intermediate_outputs[j - 1] - gamma*(-j) * (grad_x)
-
-                #if j == -1:
-                #print(sum(dE))
-                Error = 0.5 * (dE ** 2)
-                print(sum(Error))
-                print('----------------------------------------')
-
-            
-
-    def test(self, test_data_inputs, test_data_outputs):
-        
+        rng = np.random.default_rng(seed)
+        history = []
+        for epoch in range(epochs):
+            rate = learning_rate if schedule is None else schedule(epoch)
+            if train_data_outputs is None:
+                batches = train_data_inputs
+            else:
+                batches = self.batches(train_data_inputs, train_data_outputs, batch_size, shuffle, rng)
+
+            total_error = 0
+            n_samples = 0
+            for inputs, outputs in batches:
+                total_error += self.train_step(inputs, outputs, rate) * len(inputs)
+                n_samples += len(inputs)
+            history.append(float(total_error / max(n_samples, 1)))
+            if verbose:
+                print('epoch', epoch, 'learning rate', rate, 'error', history[-1])
+        return history
+
+    # cut the arrays into mini-batches, gathering the rows of each batch into the same two buffers of compute_dtype
+    def batches(self, inputs, outputs, batch_size, shuffle, rng):
+        inputs = np.asarray(inputs)
+        outputs = np.asarray(outputs)
+        n = len(inputs)
+        order = rng.permutation(n) if shuffle else np.arange(n)
+        batch_inputs = np.empty((min(batch_size, n),) + inputs.shape[1:], dtype=self.compute_dtype)
+        batch_outputs = np.empty((min(batch_size, n),) + outputs.shape[1:], dtype=self.compute_dtype)
+        for start in range(0, n, batch_size):
+            idx = order[start:start + batch_size]
+            # the rows are gathered and converted to compute_dtype in one go
+            batch_inputs[:len(idx)] = inputs[idx]
+            batch_outputs[:len(idx)] = outputs[idx]
+            yield batch_inputs[:len(idx)], batch_outputs[:len(idx)]
+
+    # learning rate schedules, to be given to train
+    # the rate is multiplied by factor every "every" epochs
+    def step_decay(learning_rate, factor=0.5, every=10):
+        return lambda epoch: learning_rate * factor ** (epoch // every)
+
+    # the rate is multiplied by factor every epoch
+    def exponential_decay(learning_rate, factor=0.95):
+        return lambda epoch: learning_rate * factor ** epoch
+
+    # the activations of every layer for a batch of up to batch_size samples, along with the
+    # deltas of the backward pass and a scratch array for the derivative of the transform.
+    # They are allocated once and kept, and a smaller batch uses the first rows
+    def activation_buffers(self, batch_size):
+        if self.buffer_size < batch_size or self.buffer_layers != list(self.n_layers):
+            self.activations = [np.empty((batch_size, size), dtype=self.compute_dtype) for size in self.n_layers[1:]]
+            self.deltas = [np.empty((batch_size, size), dtype=self.compute_dtype) for size in self.n_layers[1:]]
+            self.derivatives = [np.empty((batch_size, size), dtype=self.compute_dtype) for size in self.n_layers[1:]]
+            self.buffer_size = batch_size
+            self.buffer_layers = list(self.n_layers)
+        return self.activations
+
+    # the gradients of the weights and biases, with the same shapes in compute_dtype, allocated once.
+    # Weights stored in another type have no gradient buffer (None), as they are updated chunk by chunk
+    def gradient_buffers(self):
+        shapes = [weight.shape for weight in self.weight_layers]
+        if self.gradient_shapes != shapes:
+            self.weight_gradients = [np.empty(weight.shape, dtype=self.compute_dtype)
+                                     if weight.dtype == self.compute_dtype else None for weight in self.weight_layers]
+            self.bias_gradients = [np.empty(bias.shape, dtype=self.compute_dtype) for bias in self.bias_layers]
+            self.gradient_shapes = shapes
+        return self.weight_gradients, self.bias_gradients
+
+    # the forward pass of a batch, written into the activation buffers.
+    # Inputs of another type than compute_dtype are converted first
+    def forward(self, inputs):
+        Z = [np.asarray(inputs, dtype=self.compute_dtype)]
+        for idx, buffer in enumerate(self.activation_buffers(len(inputs))):
+            A = buffer[:len(inputs)]
+            # the derivatives are only needed by the backward pass, so they can hold the partial products
+            self.multiply(Z[idx], idx, out=A, tmp=self.derivatives[idx][:len(inputs)])
+            A += self.bias_layers[idx]
+            np.maximum(A, 0, out=A)
+            Z.append(A)
+        return Z
+
+    # one forward and one backward pass over a mini-batch, returns the mean error of the batch
+    def train_step(self, train_data_inputs, train_data_outputs, learning_rate=0.01):
+        if len(train_data_inputs) != len(train_data_outputs):
+            raise Exception("The number of inputs does not match the number of outputs")
+
+        intermediate_outputs = self.forward(train_data_inputs)
+        return self.backward(intermediate_outputs, train_data_outputs, learning_rate)
+
+    '''
+    Backpropagate the error E = 1/2N sum |Z_n - correct_output|^2 of a batch through the layers and take a
+    gradient descent step of size gamma. With Z_j = transform(Z_j-1 W_j + b_j), the deltas dE/dA_j are
+        delta_n = (Z_n - correct_output) / N * transform'(A_n)
+        delta_j-1 = (delta_j W_j^T) * transform'(A_j-1)
+    and the gradients are Z_j-1^T delta_j for W_j and the column sums of delta_j for b_j. For the ReLU,
+    transform'(A) is 1 exactly where Z = transform(A) is positive, which is sign(Z).
+    Every delta is computed before its weights are changed, and everything is written into the buffers
+    allocated by activation_buffers and gradient_buffers, so a step does not allocate any array.
+    With float16 weights the whole step is computed in float32 and only rounded when it is applied, one chunk
+    of rows at a time (see update_chunks).
+    Returns the error before the step
+    '''
+    def backward(self, intermediate_outputs, correct_output, gamma):
+        n = len(correct_output)
+        weight_gradients, bias_gradients = self.gradient_buffers()
+
+        delta = self.deltas[-1][:n]
+        np.subtract(intermediate_outputs[-1], correct_output, out=delta)
+        error = 0.5 * float(np.vdot(delta, delta)) / n
+        delta *= 1 / n
+
+        for j in range(len(self.weight_layers) - 1, -1, -1):
+            derivative = self.derivatives[j][:n]
+            np.sign(intermediate_outputs[j + 1], out=derivative)
+            delta *= derivative
+
+            np.sum(delta, axis=0, keepdims=True, out=bias_gradients[j])
+            below = self.deltas[j - 1][:n] if j > 0 else None
+
+            if weight_gradients[j] is None:
+                self.update_chunks(j, intermediate_outputs[j], delta, gamma, below)
+            else:
+                np.matmul(intermediate_outputs[j].T, delta, out=weight_gradients[j])
+                # the delta of the layer below needs the weights before the step
+                if below is not None:
+                    np.matmul(delta, self.weight_layers[j].T, out=below)
+                weight_gradients[j] *= gamma
+                self.weight_layers[j] -= weight_gradients[j]
+
+            bias_gradients[j] *= gamma
+            self.bias_layers[j] -= bias_gradients[j]
+            if below is not None:
+                delta = below
+        return error
+
+    # the gradient step of weights stored in another type than compute_dtype, chunk by chunk: the rows of the
+    # gradient Z^T delta that belong to the chunk are computed in the second half of the scratch buffer, the
+    # delta of the layer below gets its columns from the chunk before it changes, and the updated chunk is
+    # rounded back into the weights. So no gradient or converted copy of the whole weight matrix is ever kept
+    def update_chunks(self, idx, Z, delta, gamma, below=None):
+        weight = self.weight_layers[idx]
+        for rows, chunk in self.weight_chunks(idx):
+            half = len(self.scratch) // 2
+            gradient = self.scratch[half:half + chunk.size].reshape(chunk.shape)
+            np.matmul(Z[:, rows].T, delta, out=gradient)
+            if below is not None:
+                np.matmul(delta, chunk.T, out=below[:, rows])
+            gradient *= gamma
+            chunk -= gradient
+            weight[rows] = chunk
+
+
+    '''
+    Run a whole batch of inputs, an (N x input_size) array, through the network with one matrix product per layer.
+    Large batches are processed chunk_size rows at a time, so the intermediate activations never hold more than
+    chunk_size rows. Only the outputs of the last layer are returned, an (N x output_size) array, unless
+    all_layers is True, in which case the activations of every layer are returned, like compute does
+    '''
+    def predict(self, batch, chunk_size=4096, all_layers=False):
+        batch = np.asarray(batch)
+        if batch.ndim == 1:
+            batch = batch.reshape(1, -1)
+        if batch.shape[1] != len(self.weight_layers[0]):
+            raise Exception("The number of inputs does not fit the model")
+
+        n = len(batch)
+        layers = self.n_layers[1:] if all_layers else self.n_layers[-1:]
+        outputs = [np.empty((n, size), dtype=self.compute_dtype) for size in layers]
+        for start in range(0, n, chunk_size):
+            Z = np.asarray(batch[start:start + chunk_size], dtype=self.compute_dtype)
+            for idx in range(len(self.weight_layers)):
+                Z = self.multiply(Z, idx)
+                Z += self.bias_layers[idx]
+                np.maximum(Z, 0, out=Z)
+                if all_layers:
+                    outputs[idx][start:start + chunk_size] = Z
+            if not all_layers:
+                outputs[0][start:start + chunk_size] = Z
+
+        if all_layers:
+            return [batch] + outputs
+        return outputs[0]
+
+    # the fraction of the test inputs whose largest output is at the right place.
+    # The expected outputs are either one hot rows or the labels themselves
+    def test(self, test_data_inputs, test_data_outputs, chunk_size=4096):
         if len(test_data_inputs) != len(test_data_outputs):
             raise Exception("The number of inputs does not match the number of outputs")
-        for idx in range(len(test_data_inputs)):
-            ti = test_data_inputs[idx]
-            to = test_data_outputs[idx]
 
-            H = self.compute(ti)
-            
-            me = np.max(H[-1])
-            co = np.zeros(len(H[-1]))
-            for i in range(len(H[-1])):
-                #print(H[-1][i])
-                ...
-            ##print(co)
-            
+        test_data_outputs = np.asarray(test_data_outputs)
+        if test_data_outputs.ndim == 2:
+            test_data_outputs = np.argmax(test_data_outputs, axis=1)
+        predictions = np.argmax(self.predict(test_data_inputs, chunk_size), axis=1)
+        return float(np.mean(predictions == test_data_outputs))
 
 
 if __name__ == '__main__':
@@ -234,4 +481,10 @@ if __name__ == '__main__':
         print(fnn_b[i] - fnn2_b[i])
 
 
-    
\ No newline at end of file
+    
+    # the same check with the binary format
+    fnn.save("temp.bnn")
+    fnn3 = BasicNeuralNetwork()
+    fnn3.load("temp.bnn")
+    for i in range(len(fnn_w)):
+        print(fnn_w[i] - fnn3.weight_layers[i])
@@ -0,0 +1,120 @@
+import queue
+import threading
+import numpy as np
+from read_numbers import read_idx
+
+# This class streams a dataset as mini-batches.
+# The samples are kept as they are stored, usually a memory mapped IDX file of uint8 pixels,
+# and only the samples of the current batch are read, converted to float and normalized.
+# So the memory used stays at a few batches no matter how large the dataset is.
+# Every pass over the loader is one epoch, in a new random order when shuffle is True.
+# Each batch is an (inputs, outputs) pair, where inputs is (batch_size x n_features) and
+# outputs is either the one hot encoding of the labels (batch_size x n_classes) or the labels themselves
+class DataLoader:
+
+    # images is any array whose first axis runs over the samples, labels holds one integer per sample.
+    # normalize is "scale" to divide by scale (255 for pixels), "standardize" to give every
+    # sample zero mean and unit variance, None to keep the values, or a function applied to each batch.
+    # With prefetch > 0 a background thread prepares up to that many batches ahead
+    def __init__(self, images, labels, batch_size=32, shuffle=True, one_hot=True, n_classes=10,
+                 normalize="scale", scale=255, prefetch=0, drop_last=False, dtype=np.float32, seed=None):
+        if len(images) != len(labels):
+            raise Exception("The number of images does not match the number of labels")
+        self.images = images
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.one_hot = one_hot
+        self.n_classes = n_classes
+        self.normalize = normalize
+        self.scale = scale
+        self.prefetch = prefetch
+        self.drop_last = drop_last
+        self.dtype = np.dtype(dtype)
+        self.rng = np.random.default_rng(seed)
+
+    # build a loader straight from IDX files, which are memory mapped when they are not compressed
+    @staticmethod
+    def from_idx(image_files, label_files, **kwargs):
+        return DataLoader(read_idx(image_files), read_idx(label_files), **kwargs)
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.labels) // self.batch_size
+        return -(-len(self.labels) // self.batch_size)
+
+    # the sample indices of every batch of one epoch
+    def batch_indices(self):
+        n = len(self.labels)
+        order = self.rng.permutation(n) if self.shuffle else np.arange(n)
+        for start in range(0, n, self.batch_size):
+            idx = order[start:start + self.batch_size]
+            if self.drop_last and len(idx) < self.batch_size:
+                break
+            # reading the samples in file order is much kinder to a memory map,
+            # and the order within a batch does not matter
+            yield np.sort(idx) if self.shuffle else idx
+
+    # read and normalize the samples at idx
+    def make_batch(self, idx):
+        raw = self.images[idx]
+        inputs = np.empty((len(idx), raw[0].size), dtype=self.dtype)
+        inputs[...] = raw.reshape(len(idx), -1)
+
+        if self.normalize == "scale":
+            inputs *= 1 / self.scale
+        elif self.normalize == "standardize":
+            inputs -= inputs.mean(axis=1, keepdims=True)
+            inputs /= np.maximum(inputs.std(axis=1, keepdims=True), np.finfo(self.dtype).eps)
+        elif self.normalize is not None:
+            inputs = self.normalize(inputs)
+
+        labels = self.labels[idx]
+        if not self.one_hot:
+            return inputs, labels
+        outputs = np.zeros((len(idx), self.n_classes), dtype=self.dtype)
+        outputs[np.arange(len(idx)), labels] = 1
+        return inputs, outputs
+
+    def __iter__(self):
+        if self.prefetch <= 0:
+            for idx in self.batch_indices():
+                yield self.make_batch(idx)
+            return
+
+        # the worker puts batches in the queue, then None once the epoch is over,
+        # or the exception it ran into. stop tells it the consumer has gone away
+        batches = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def worker():
+            try:
+                for idx in self.batch_indices():
+                    if not put(self.make_batch(idx)):
+                        return
+                put(None)
+            except Exception as error:
+                put(error)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+            thread.join()
@@ -13,7 +13,7 @@ def main():
         t = np.zeros(10)
         t[label] = 1
         train_data_outputs.append(t)
-    mnist_fnn_model = BasicNeuralNetwork(784, 100, 10)
+    mnist_fnn_model = BasicNeuralNetwork(784, 100, 10, dtype=np.float32)
 
     """
     number = 100
@@ -56,7 +56,7 @@ def main():
         t = np.zeros(10)
         t[label] = 1
         test_data_outputs.append(t)
-    mnist_fnn_model.test(test_data_inputs, test_data_outputs)
+    print("accuracy:", mnist_fnn_model.test(test_data_inputs, test_data_outputs))
 
 
     print(mnist_fnn_model)
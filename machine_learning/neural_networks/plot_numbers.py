@@ -12,7 +12,7 @@ def plotter(screen, pdata, label, coord, font):
         shade_str = ""
         for col in range(28):
             rect = pygame.Rect(col*UNIT+coord[0],row*UNIT+coord[1],UNIT,UNIT)
-            shade = pdata[row * 28 + col] * 256
+            shade = pdata[row * 28 + col] * 255
             shade_str += str(shade) + " "
             pygame.draw.rect(screen,(shade,shade,shade),rect)
         print(shade_str)
@@ -1,85 +1,87 @@
+import gzip
+import os
 import numpy as np
 
+# The data type of the payload, given by the third byte of the magic number of an IDX file.
+# Multi-byte values are stored big endian
+IDX_TYPES = {
+    0x08: np.dtype('u1'),
+    0x09: np.dtype('i1'),
+    0x0B: np.dtype('>i2'),
+    0x0C: np.dtype('>i4'),
+    0x0D: np.dtype('>f4'),
+    0x0E: np.dtype('>f8'),
+}
+
+# Every file can be found either uncompressed or as the .gz from the MNIST website
+TRAIN_IMAGES = ["data/train-images.idx3-ubyte", "data/train-images-idx3-ubyte.gz"]
+TRAIN_LABELS = ["data/train-labels.idx1-ubyte", "data/train-labels-idx1-ubyte.gz"]
+TEST_IMAGES = ["data/t10k-images.idx3-ubyte", "data/t10k-images-idx3-ubyte.gz"]
+TEST_LABELS = ["data/t10k-labels.idx1-ubyte", "data/t10k-labels-idx1-ubyte.gz"]
+
+# return the first of the candidate paths that exists
+def find_file(candidates):
+    if isinstance(candidates, str):
+        candidates = [candidates]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError("None of these files exist: " + ", ".join(candidates))
+
+# parse the header of an IDX file: two zero bytes, the data type, the number of dimensions,
+# then every dimension as a big endian 32 bit integer.
+# returns the data type, the shape and the size of the header in bytes
+def parse_idx_header(header):
+    if len(header) < 4 or header[0] != 0 or header[1] != 0 or header[2] not in IDX_TYPES:
+        raise Exception("Not an IDX file")
+    ndims = header[3]
+    if len(header) < 4 + 4 * ndims:
+        raise Exception("The IDX header is truncated")
+    shape = tuple(int(d) for d in np.frombuffer(header, dtype='>u4', count=ndims, offset=4))
+    return IDX_TYPES[header[2]], shape, 4 + 4 * ndims
+
+# read a whole IDX file as an array with the shape given in its header.
+# Uncompressed files are memory mapped, so nothing is read until it is used,
+# and .gz files are decompressed in one go
+def read_idx(candidates, mmap=True):
+    path = find_file(candidates)
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rb') as file:
+            content = file.read()
+        dtype, shape, offset = parse_idx_header(content[:4 + 4 * 255])
+        return np.frombuffer(content, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+
+    with open(path, 'rb') as file:
+        dtype, shape, offset = parse_idx_header(file.read(4 + 4 * 255))
+    if mmap:
+        return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+    return np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+
+# read the first number_of_data images of an IDX file as rows of pixels, a (N, 784) array for MNIST.
+# With dtype=np.uint8 the raw pixels are returned, otherwise they are scaled to [0, 1].
+# All the images are read when number_of_data is None
+def read_images(candidates, number_of_data=None, dtype=np.float32):
+    images = read_idx(candidates)
+    images = images[:number_of_data].reshape(len(images[:number_of_data]), -1)
+    if dtype == np.uint8:
+        return np.array(images)
+    return np.divide(images, 255, dtype=dtype)
+
+def read_labels(candidates, number_of_data=None):
+    return np.array(read_idx(candidates)[:number_of_data], dtype=np.int64)
+
 # read training data
 # returns a list of the testing data as well as the label of each testing data
-def read_train_data(number_of_data):
-    file = open("data/train-images.idx3-ubyte",'rb')
-    a = file.read(4)
-    b = file.read(4)
-    length = file.read(4)
-    width = file.read(4)
-
-    ''' Purely for sanity check
-    print
-    magic = int.from_bytes(a, "big")
-    total = int.from_bytes(b, "big")
-    print(a)
-    print(b)
-    print(magic)
-    print(total)
-    ''' 
-
-    raw_numbers = []
-    for iter in range(number_of_data):
-        raw_number = np.zeros(784)
-        for i in range(784):
-            a = int.from_bytes(file.read(1), "big")
-            raw_number[i] = a
-        raw_numbers.append(raw_number / 256)
-
-    file.close()
-
-    file = open("data/train-labels.idx1-ubyte",'rb')
-    a = file.read(4)
-    b = file.read(4)
-
-    labels = []
-    for label in range(number_of_data):
-        labels.append(int.from_bytes(file.read(1), "big"))
-
-    file.close()
-
-    return np.array(raw_numbers), labels
+def read_train_data(number_of_data, dtype=np.float32):
+    return read_images(TRAIN_IMAGES, number_of_data, dtype), read_labels(TRAIN_LABELS, number_of_data)
 
 
 # read test data
 # returns two outputs, a list of the testing data as well as the label of each testing data
-def read_test_data(number_of_data):
-    file = open("data/t10k-images.idx3-ubyte",'rb')
-    a = file.read(4)
-    b = file.read(4)
-
-    ''' Purely for sanity check
-    magic = int.from_bytes(a)
-    total = int.from_bytes(b)    
-    print(a)
-    print(b)
-    print(magic)
-    print(total)
-    '''
-
-    raw_numbers = []
-    for iter in range(number_of_data):
-        raw_number = np.zeros(784)
-        for i in range(784):
-            a = int.from_bytes(file.read(1))
-            raw_number[i] = a
-        raw_numbers.append(raw_number / 255)
-
-    file.close()
-
-    file = open("data/t10k-labels.idx1-ubyte",'rb')
-    a = file.read(4)
-    b = file.read(4)
-
-    labels = []
-    for label in range(number_of_data):
-        labels.append(int.from_bytes(file.read(1)))
-
-    file.close()
-
-    return np.array(raw_numbers), labels
+def read_test_data(number_of_data, dtype=np.float32):
+    return read_images(TEST_IMAGES, number_of_data, dtype), read_labels(TEST_LABELS, number_of_data)
 
 if __name__ == '__main__':
-    raw_numbers, labels = read_train_data(10)
-    print(labels)
\ No newline at end of file
+    raw_numbers, labels = read_test_data(10)
+    print(raw_numbers.shape, raw_numbers.dtype)
+    print(labels)